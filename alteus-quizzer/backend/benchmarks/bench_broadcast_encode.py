@@ -0,0 +1,88 @@
+"""
+Encode cost of one STATE_UPDATE broadcast as the room grows.
+
+"before" serializes the state once per recipient (what per-socket `send_json` did),
+"after" serializes it once and shares the frame. Both sides use `wire.encode_message`, so the
+gain is the sharing alone, not the encoder.
+
+Importing the game module also builds the database engine (no connection is made), so the
+backend requirements must be installed (asyncpg for the default DATABASE_URL), or DATABASE_URL
+set to another installed driver, e.g. sqlite+aiosqlite://.
+
+Run from `backend/`:
+    python benchmarks/bench_broadcast_encode.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_manager import ActiveGame, manager  # noqa: E402
+from quiz_runtime import compile_quiz  # noqa: E402
+from wire import encode_message  # noqa: E402
+
+PARTICIPANT_COUNTS = [10, 50, 100, 300, 500, 1000]
+ROUNDS = 5
+
+
+def build_game(n: int) -> ActiveGame:
+    quiz = {
+        "title": "Bench",
+        "questions": [
+            {
+                "id": 1,
+                "text": "Which option is correct?",
+                "time_limit": 20,
+                "points": 1000,
+                "media_url": None,
+                "explanation": "Because.",
+                "options": [{"id": i, "text": f"Option {i}", "is_correct": i == 1} for i in range(1, 5)],
+            }
+        ],
+    }
+    code = f"B{n}"
+    game = ActiveGame(compile_quiz(quiz), code)
+    connected = manager.ensure_session(code).participants
+    for i in range(n):
+        pid = f"player-{i:05d}"
+        game.add_participant(pid, f"Player {i}", "#3B82F6")
+        game.participants.add_points(game.participants.slot(pid), i * 37)
+        connected[pid] = None
+    return game
+
+
+def per_recipient(state: dict, recipients: int) -> None:
+    message = {"type": "STATE_UPDATE", "state": state}
+    for _ in range(recipients):
+        encode_message(message)
+
+
+def once(state: dict, recipients: int) -> None:
+    encode_message({"type": "STATE_UPDATE", "state": state})
+
+
+def best_of(fn, *args) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    print(f"{'players':>8} {'frame KB':>9} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for n in PARTICIPANT_COUNTS:
+        game = build_game(n)
+        state = game.get_state()
+        # Host + every phone receive the broadcast
+        recipients = n + 1
+        frame_kb = len(encode_message({"type": "STATE_UPDATE", "state": state}).encode("utf-8")) / 1024
+        before = best_of(per_recipient, state, recipients)
+        after = best_of(once, state, recipients)
+        print(f"{n:>8} {frame_kb:>9.1f} {before * 1000:>10.2f} {after * 1000:>9.3f} {before / after:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
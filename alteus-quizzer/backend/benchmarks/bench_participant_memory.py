@@ -0,0 +1,121 @@
+"""
+Memory held per player, and the cost of rendering the roster, as the room grows.
+
+"dicts" is the previous layout (one {name, color, score} dict per player plus per-player
+entries in the answers/awards dicts); "table" is ParticipantTable + AnswerColumns. Memory is
+what tracemalloc sees allocated while building each layout for a room where every player
+has answered and been scored; "+cache" adds the encoded roster entries the table keeps once
+a snapshot has been rendered. "roster ms" renders the host roster once: rebuilding
+[{"id": ..., **player}] and encoding it, vs. joining the cached per-player entries after one
+score change.
+
+Run from `backend/`:
+    python benchmarks/bench_participant_memory.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from participant_store import ParticipantTable  # noqa: E402
+from quiz_runtime import compile_quiz  # noqa: E402
+from scoring import AnswerColumns  # noqa: E402
+from wire import encode_message  # noqa: E402
+
+PLAYER_COUNTS = [1_000, 10_000, 50_000]
+COLORS = ["#EF4444", "#F97316", "#EAB308", "#22C55E", "#3B82F6", "#8B5CF6", "#EC4899", "#14B8A6"]
+ROUNDS = 5
+QUESTION = compile_quiz({
+    "questions": [
+        {
+            "id": 1,
+            "text": "Which option is correct?",
+            "time_limit": 20,
+            "points": 1000,
+            "options": [{"id": i, "text": f"Option {i}", "is_correct": i == 0} for i in range(4)],
+        }
+    ],
+}).questions[0]
+
+
+def player(i: int):
+    # Fresh strings per player, like names/colors decoded from separate JOIN messages
+    return f"player-{i:06d}", f"Player {i}", "#" + COLORS[i % len(COLORS)][1:]
+
+
+def build_dicts(n: int):
+    participants, answers, last_awards = {}, {}, {}
+    for i in range(n):
+        p_id, name, color = player(i)
+        participants[p_id] = {"name": name, "color": color, "score": i * 37}
+        answers[p_id] = {"answer_id": str(i % 4), "time_remaining": i % 20}
+        last_awards[p_id] = 1000 + i % 500
+    return participants, answers, last_awards
+
+
+def build_table(n: int):
+    table = ParticipantTable()
+    answers = AnswerColumns(QUESTION)
+    for i in range(n):
+        p_id, name, color = player(i)
+        slot = table.add(p_id, name, color, i * 37)
+        answers.set(slot, i % 4, i % 20)
+        answers.set_award(slot, 1000 + i % 500)
+    return table, answers
+
+
+def build_table_cached(n: int):
+    table, answers = build_table(n)
+    table.roster_json()
+    return table, answers
+
+
+def allocated(build, n: int):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(n)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, result
+
+
+def best_of(fn, *args) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def roster_dicts(participants: dict) -> str:
+    return encode_message([{"id": k, **v} for k, v in participants.items()])
+
+
+def roster_table(table: ParticipantTable) -> str:
+    # One player scored since the last render
+    table.add_points(0, 1)
+    return table.roster_json()
+
+
+def main():
+    print(
+        f"{'players':>8} {'dicts B/player':>15} {'table B/player':>15} {'+cache':>7} "
+        f"{'dicts roster ms':>16} {'table roster ms':>16}"
+    )
+    for n in PLAYER_COUNTS:
+        dict_bytes, (participants, _, _) = allocated(build_dicts, n)
+        table_bytes, _ = allocated(build_table, n)
+        cached_bytes, (table, _) = allocated(build_table_cached, n)
+        before = best_of(roster_dicts, participants)
+        after = best_of(roster_table, table)
+        print(
+            f"{n:>8} {dict_bytes / n:>15.0f} {table_bytes / n:>15.0f} {cached_bytes / n:>7.0f} "
+            f"{before * 1000:>16.2f} {after * 1000:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Cost of saving a new quiz as it grows: the previous create path (commit + refresh per question,
+then the options) vs. the bulk path (one transaction, multi-row INSERT ... RETURNING).
+
+Reports wall time, SQL statements and commits per save. Runs against a throwaway SQLite file
+by default; point BENCH_DATABASE_URL at a scratch Postgres database to include network round
+trips (tables are created if missing; the quizzes it writes are deleted again).
+
+Run from `backend/`:
+    python benchmarks/bench_quiz_insert.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlmodel import SQLModel, select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from models import AnswerOption, AnswerOptionCreate, Question, QuestionCreate, Quiz, QuizCreate  # noqa: E402
+from quiz_store import insert_questions, load_quiz  # noqa: E402
+
+QUESTION_COUNTS = [10, 50, 200]
+ROUNDS = 5
+
+
+def build(n: int) -> QuizCreate:
+    return QuizCreate(
+        title=f"Bench {n}",
+        description="Benchmark quiz",
+        questions=[
+            QuestionCreate(
+                text=f"Question {i}?",
+                time_limit=20,
+                order=i,
+                options=[AnswerOptionCreate(text=f"Option {j}", is_correct=j == 0, order=j) for j in range(4)],
+            )
+            for i in range(n)
+        ],
+    )
+
+
+def new_quiz(quiz: QuizCreate) -> Quiz:
+    return Quiz(title=quiz.title, description=quiz.description, default_time_limit=quiz.default_time_limit)
+
+
+async def legacy(db: AsyncSession, quiz: QuizCreate) -> int:
+    db_quiz = new_quiz(quiz)
+    db.add(db_quiz)
+    await db.commit()
+    await db.refresh(db_quiz)
+    for q_data in quiz.questions:
+        db_question = Question(
+            quiz_id=db_quiz.id,
+            text=q_data.text,
+            time_limit=q_data.time_limit,
+            points=q_data.points,
+            order=q_data.order,
+            explanation=q_data.explanation,
+            media_url=q_data.media_url,
+            question_type=q_data.question_type,
+        )
+        db.add(db_question)
+        await db.commit()
+        await db.refresh(db_question)
+        for opt_data in q_data.options:
+            db.add(AnswerOption(question_id=db_question.id, text=opt_data.text, is_correct=opt_data.is_correct, order=opt_data.order))
+    await db.commit()
+    return db_quiz.id
+
+
+async def bulk(db: AsyncSession, quiz: QuizCreate) -> int:
+    db_quiz = new_quiz(quiz)
+    db.add(db_quiz)
+    await db.flush()
+    await insert_questions(db, db_quiz.id, quiz.questions)
+    await db.commit()
+    return db_quiz.id
+
+
+async def delete_quiz(db: AsyncSession, quiz_id: int):
+    # Clean up a saved quiz with core deletes (its options, questions, then the quiz)
+    question_ids = select(Question.id).where(Question.quiz_id == quiz_id)
+    await db.exec(delete(AnswerOption).where(AnswerOption.question_id.in_(question_ids)))
+    await db.exec(delete(Question).where(Question.quiz_id == quiz_id))
+    await db.exec(delete(Quiz).where(Quiz.id == quiz_id))
+
+
+async def main():
+    url = os.getenv("BENCH_DATABASE_URL")
+    scratch = None
+    if not url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite+aiosqlite:///{scratch.name}"
+    engine = create_async_engine(url)
+    counts = {"statements": 0, "commits": 0}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_statement(*_):
+        counts["statements"] += 1
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def _count_commit(*_):
+        counts["commits"] += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    make_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"{'questions':>9} {'path':>7} {'ms':>9} {'statements':>11} {'commits':>8}")
+    try:
+        for n in QUESTION_COUNTS:
+            quiz = build(n)
+            for name, save in (("legacy", legacy), ("bulk", bulk)):
+                best = float("inf")
+                for _ in range(ROUNDS):
+                    async with make_session() as db:
+                        counts.update(statements=0, commits=0)
+                        t0 = time.perf_counter()
+                        quiz_id = await save(db, quiz)
+                        best = min(best, time.perf_counter() - t0)
+                        statements, commits = counts["statements"], counts["commits"]
+                        saved = await load_quiz(db, quiz_id)
+                        assert len(saved.questions) == n and all(len(q.options) == 4 for q in saved.questions)
+                        await delete_quiz(db, quiz_id)
+                        await db.commit()
+                print(f"{n:>9} {name:>7} {best * 1000:>9.1f} {statements:>11} {commits:>8}")
+    finally:
+        await engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
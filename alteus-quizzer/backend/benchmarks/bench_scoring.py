@@ -0,0 +1,114 @@
+"""
+Cost of scoring one question as the number of answers grows.
+
+"legacy" is the original per-answer loop (str() on every option comparison, dict lookups),
+"loop" the compiled-question loop over the answer columns, "numpy" the vectorized pass.
+Every path is checked to award exactly the same points, for every points system.
+
+Run from `backend/`:
+    python benchmarks/bench_scoring.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quiz_runtime import compile_quiz  # noqa: E402
+from scoring import AnswerColumns, _score_loop, _score_vectorized  # noqa: E402
+
+ANSWER_COUNTS = [1_000, 10_000, 50_000]
+POINTS_SYSTEMS = ["standard", "simple", "no_points"]
+ROUNDS = 5
+TIME_LIMIT = 20
+
+
+def build(n: int):
+    quiz = compile_quiz({
+        "title": "Bench",
+        "questions": [
+            {
+                "id": 1,
+                "text": "Which option is correct?",
+                "time_limit": TIME_LIMIT,
+                "points": 1000,
+                "options": [{"id": 100 + i, "text": f"Option {i}", "is_correct": i == 2} for i in range(4)],
+            }
+        ],
+    })
+    question = quiz.questions[0]
+    rng = random.Random(n)
+    answers = {}
+    columns = AnswerColumns(question)
+    for i in range(n):
+        p_id = f"player-{i:06d}"
+        option_index = rng.randrange(4)
+        # Whole seconds, including the half-way values where rounding matters
+        time_remaining = rng.randint(0, TIME_LIMIT)
+        answers[p_id] = {"answer_id": question.option_ids[option_index], "time_remaining": time_remaining}
+        # Player i has slot i
+        columns.set(i, option_index, time_remaining)
+    return quiz.to_dict()["questions"][0], question, answers, columns
+
+
+def legacy(question: dict, answers: dict, points_system: str) -> list:
+    results = []
+    for p_id, payload in answers.items():
+        ans_id = payload.get("answer_id")
+        ans_time_remaining = int(payload.get("time_remaining") or 0)
+        is_correct = any(
+            str(opt.get("id")) == str(ans_id) and opt.get("is_correct")
+            for opt in question["options"]
+        )
+        if is_correct:
+            if points_system == "no_points":
+                awarded = 0
+            elif points_system == "simple":
+                awarded = 1
+            else:
+                base = int(question.get("points") or 0)
+                time_limit = int(question.get("time_limit") or 0)
+                bonus = 0
+                if base > 0 and time_limit > 0:
+                    ratio = max(0.0, min(1.0, ans_time_remaining / float(time_limit)))
+                    bonus = int(round(base * 0.5 * ratio))
+                awarded = base + bonus
+            results.append((p_id, True, awarded))
+        else:
+            results.append((p_id, False, 0))
+    return results
+
+
+def best_of(fn, *args) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    print(f"{'answers':>8} {'points':>10} {'legacy ms':>10} {'loop ms':>8} {'numpy ms':>9} {'speedup':>8}")
+    for n in ANSWER_COUNTS:
+        raw, question, answers, columns = build(n)
+        for points_system in POINTS_SYSTEMS:
+            # Columns report slots rather than ids; every player answered, so slot = position
+            expected = [
+                (slot, correct, awarded)
+                for slot, (_, correct, awarded) in enumerate(legacy(raw, answers, points_system))
+            ]
+            assert _score_loop(question, columns, points_system) == expected
+            before = best_of(legacy, raw, answers, points_system)
+            loop = best_of(_score_loop, question, columns, points_system)
+            assert _score_vectorized(question, columns, points_system) == expected
+            vectorized = best_of(_score_vectorized, question, columns, points_system)
+            print(
+                f"{n:>8} {points_system:>10} {before * 1000:>10.2f} {loop * 1000:>8.2f} "
+                f"{vectorized * 1000:>9.2f} {before / vectorized:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+JSON vs MessagePack frames for a 500-player room.
+
+For each typical frame (host snapshot with the full roster, the review patch with every
+score, a phone's patch, an inbound answer) prints the size on the wire and the CPU time to
+encode and decode it. "transcode" is what the server actually pays per frame for binary
+clients: frames are built as JSON and re-encoded once per worker.
+
+Run from `backend/`:
+    python benchmarks/bench_wire_format.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_manager import ActiveGame  # noqa: E402
+from quiz_runtime import compile_quiz  # noqa: E402
+from state_sync import patch_message, snapshot_message  # noqa: E402
+from wire import decode_message, decode_msgpack, encode_message, msgpack, to_msgpack  # noqa: E402
+
+PLAYERS = 500
+ROUNDS = 200
+
+
+def build_game(n: int) -> ActiveGame:
+    quiz = {
+        "title": "Bench",
+        "questions": [
+            {
+                "id": 1,
+                "text": "Which option is correct?",
+                "time_limit": 20,
+                "points": 1000,
+                "media_url": None,
+                "explanation": "Because.",
+                "options": [{"id": i, "text": f"Option {i}", "is_correct": i == 1} for i in range(1, 5)],
+            }
+        ],
+    }
+    game = ActiveGame(compile_quiz(quiz), "WIRE")
+    for i in range(n):
+        pid = f"player-{i:05d}"
+        game.add_participant(pid, f"Player {i}", "#3B82F6")
+        slot = game.participants.slot(pid)
+        game.participants.add_points(slot, i * 37)
+        game.answers.set_award(slot, 1000 + i)
+    game.status = "REVIEW"
+    return game
+
+
+def frames(game: ActiveGame) -> dict:
+    roster = game.participants.records()
+    return {
+        "host snapshot": snapshot_message(1, game.get_state()),
+        "review patch": patch_message(
+            2, 1, {"status": "REVIEW", "lastAwards": game.last_awards()}, upsert=roster, remove=[]
+        ),
+        "phone patch": {
+            **patch_message(2, 1, {"status": "REVIEW", "timeRemaining": 0, "deadline": None}),
+            "me": game.me_state("player-00042"),
+        },
+        "inbound answer": {"action": "SUBMIT_ANSWER", "answerId": "3"},
+    }
+
+
+def best_of(fn, arg) -> float:
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(ROUNDS):
+            fn(arg)
+        best = min(best, (time.perf_counter() - t0) / ROUNDS)
+    return best * 1e6
+
+
+def main():
+    game = build_game(PLAYERS)
+    print(f"{PLAYERS} players")
+    print(
+        f"{'frame':<15} {'json B':>8} {'msgpack B':>10} {'saved':>6} "
+        f"{'json enc/dec us':>16} {'msgpack enc/dec us':>19} {'transcode us':>13}"
+    )
+    for name, message in frames(game).items():
+        as_json = encode_message(message)
+        as_msgpack = msgpack.packb(message)
+        # Both encodings must carry exactly the same data
+        assert decode_msgpack(to_msgpack(as_json)) == decode_message(as_json)
+        json_bytes = len(as_json.encode("utf-8"))
+        saved = 1 - len(as_msgpack) / json_bytes
+        json_enc = best_of(encode_message, message)
+        json_dec = best_of(decode_message, as_json)
+        mp_enc = best_of(msgpack.packb, message)
+        mp_dec = best_of(decode_msgpack, as_msgpack)
+        transcode = best_of(to_msgpack, as_json)
+        print(
+            f"{name:<15} {json_bytes:>8} {len(as_msgpack):>10} {saved:>6.0%} "
+            f"{json_enc:>7.1f}/{json_dec:<8.1f} {mp_enc:>9.1f}/{mp_dec:<9.1f} {transcode:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
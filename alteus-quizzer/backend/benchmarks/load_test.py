@@ -0,0 +1,397 @@
+"""
+WebSocket load generator: how many players can one backend instance handle?
+
+For every participant count it creates a quiz (`POST /quizzes/`) and a session
+(`POST /sessions/`), opens that many participant sockets on `/ws/{code}/{client_id}`, JOINs
+them, then drives the host through START_GAME / SKIP_TIMER / NEXT_QUESTION while the phones
+answer on the configured delay distribution. Per run it reports:
+
+- broadcast latency (p50/p99): host action sent -> each phone sees the new phase
+- frames/s and MB received by all simulated clients
+- server CPU % and RSS (needs the server pid: `--spawn` or `--server-pid`, Linux or psutil)
+
+The quiz, answer timing and option choices are driven by `--seed`, so runs are comparable;
+`--json` saves the rows for diffing against a previous run.
+
+Run from `backend/`, against a running server:
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --players 100,500,1000
+or let it start its own server (backend/.env configuration) on a free port:
+    python benchmarks/load_test.py --spawn --players 100,500,1000,2000
+
+Thousands of sockets need a high enough open-file limit (`ulimit -n 65535`).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import websockets
+
+import msgpack
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - depends on the environment
+    psutil = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPTIONS_PER_QUESTION = 4
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    # Nearest-rank percentile
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# --- Server process metrics ---
+
+def process_sample(pid: Optional[int]) -> Optional[Tuple[float, int]]:
+    # (CPU seconds used so far, RSS bytes) of the server process
+    if pid is None:
+        return None
+    if psutil is not None:
+        proc = psutil.Process(pid)
+        cpu = proc.cpu_times()
+        return cpu.user + cpu.system, proc.memory_info().rss
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = os.sysconf("SC_CLK_TCK")
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / ticks
+        with open(f"/proc/{pid}/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        return cpu_seconds, rss
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(port: int) -> subprocess.Popen:
+    # Same configuration (.env / DATABASE_URL) as a normal `uvicorn main:app` from backend/
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_for_server(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(f"{base_url}/")
+                return
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+# --- Simulated clients ---
+
+class Stats:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+        # phase (status, question index) -> arrival times (perf_counter) across phones
+        self.phase_seen: Dict[Tuple[str, int], List[float]] = {}
+        self.joined = 0
+
+
+class Phone:
+    """One simulated participant: keeps its view of the state and answers each question."""
+
+    def __init__(self, index: int, args, stats: Stats, answer_plan: List[List[Tuple[float, int]]]):
+        self.client_id = f"load-{index:05d}"
+        self.index = index
+        self.args = args
+        self.stats = stats
+        self.answer_plan = answer_plan
+        self.state: dict = {}
+        self.phase: Optional[Tuple[str, int]] = None
+        self.joined = False
+        self.ws = None
+        self.tasks: List[asyncio.Task] = []
+
+    async def connect(self, ws_url: str, code: str):
+        subprotocols = ["alteus.msgpack"] if self.args.msgpack else None
+        self.ws = await websockets.connect(
+            f"{ws_url}/ws/{code}/{self.client_id}",
+            subprotocols=subprotocols,
+            max_size=None,
+            open_timeout=60,
+        )
+        self.tasks.append(asyncio.create_task(self.read_loop()))
+        await self.send({"action": "JOIN", "name": f"Load {self.index}", "color": "#3B82F6"})
+
+    async def send(self, message: dict):
+        if self.args.msgpack:
+            await self.ws.send(msgpack.packb(message))
+        else:
+            await self.ws.send(json.dumps(message))
+
+    async def read_loop(self):
+        try:
+            async for raw in self.ws:
+                now = time.perf_counter()
+                self.stats.frames += 1
+                self.stats.bytes += len(raw)
+                message = msgpack.unpackb(raw) if isinstance(raw, bytes) else json.loads(raw)
+                self.on_message(message, now)
+        except websockets.ConnectionClosed:
+            pass
+
+    def on_message(self, message: dict, now: float):
+        kind = message.get("type")
+        if kind == "STATE_UPDATE":
+            self.state = dict(message["state"])
+        elif kind == "STATE_PATCH":
+            self.state.update(message.get("changes") or {})
+        if message.get("me") is not None and not self.joined:
+            self.joined = True
+            self.stats.joined += 1
+        if not self.state:
+            return
+        phase = (self.state.get("status"), self.state.get("currentQuestionIndex"))
+        if phase != self.phase:
+            self.phase = phase
+            self.stats.phase_seen.setdefault(phase, []).append(now)
+            if phase[0] == "ACTIVE":
+                self.tasks.append(asyncio.create_task(self.answer(phase[1])))
+
+    async def answer(self, question_index: int):
+        delay, option_id = self.answer_plan[question_index][self.index]
+        await asyncio.sleep(delay)
+        if self.phase == ("ACTIVE", question_index):
+            await self.send({"action": "SUBMIT_ANSWER", "answerId": str(option_id)})
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        if self.ws is not None:
+            await self.ws.close()
+
+
+def build_quiz(args) -> dict:
+    # Question time limit comfortably covers the answer window; the host skips the rest
+    return {
+        "title": f"Load test ({args.questions} questions)",
+        "default_time_limit": 30,
+        "questions": [
+            {
+                "text": f"Load question {q + 1}",
+                "time_limit": int(args.answer_window) + 10,
+                "points": 1000,
+                "order": q,
+                "options": [
+                    {"text": f"Option {o + 1}", "is_correct": o == 0, "order": o}
+                    for o in range(OPTIONS_PER_QUESTION)
+                ],
+            }
+            for q in range(args.questions)
+        ],
+    }
+
+
+def plan_answers(args, quiz: dict, players: int) -> List[List[Tuple[float, int]]]:
+    # (delay, option id) per question per phone, fixed by the seed
+    rng = random.Random(args.seed)
+    plan = []
+    for question in quiz["questions"]:
+        options = [o["id"] for o in question["options"]]
+        correct = [o["id"] for o in question["options"] if o["is_correct"]]
+        row = []
+        for _ in range(players):
+            if args.answer_dist == "burst":
+                delay = 0.0
+            elif args.answer_dist == "exponential":
+                delay = min(args.answer_window, rng.expovariate(3.0 / max(args.answer_window, 0.001)))
+            else:
+                delay = rng.uniform(0, args.answer_window)
+            option = correct[0] if rng.random() < args.correct_ratio else rng.choice(options)
+            row.append((delay, option))
+        plan.append(row)
+    return plan
+
+
+async def wait_until(predicate, timeout: float):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+async def run_once(args, base_url: str, players: int, server_pid: Optional[int]) -> dict:
+    ws_url = base_url.replace("http", "ws", 1)
+    async with httpx.AsyncClient(timeout=60) as client:
+        quiz = (await client.post(f"{base_url}/quizzes/", json=build_quiz(args))).json()
+        code = (await client.post(f"{base_url}/sessions/", params={"quiz_id": quiz["id"]})).json()["code"]
+
+    stats = Stats()
+    plan = plan_answers(args, quiz, players)
+    phones = [Phone(i, args, stats, plan) for i in range(players)]
+    host = await websockets.connect(f"{ws_url}/ws/{code}/host", max_size=None)
+    host_reader = asyncio.create_task(drain(host, stats))
+
+    # Open the sockets in waves so the accept backlog isn't the thing being measured
+    t_connect = time.perf_counter()
+    gate = asyncio.Semaphore(args.connect_concurrency)
+
+    async def connect(phone: Phone):
+        async with gate:
+            await phone.connect(ws_url, code)
+
+    await asyncio.gather(*(connect(p) for p in phones))
+    joined = await wait_until(lambda: stats.joined >= players, args.timeout)
+    connect_seconds = time.perf_counter() - t_connect
+    if not joined:
+        print(f"  warning: only {stats.joined}/{players} phones saw their JOIN confirmed")
+
+    before = process_sample(server_pid)
+    t_start = time.perf_counter()
+    frames_before = stats.frames
+    latencies: List[float] = []
+    review_latencies: List[float] = []
+
+    async def phase_change(action: str, phase: Tuple[str, int], samples: List[float]):
+        sent = time.perf_counter()
+        await host.send(json.dumps({"action": action}))
+        await wait_until(lambda: len(stats.phase_seen.get(phase, [])) >= players, args.timeout)
+        samples.extend((t - sent) * 1000 for t in stats.phase_seen.get(phase, []))
+
+    for q in range(args.questions):
+        await phase_change("START_GAME" if q == 0 else "NEXT_QUESTION", ("ACTIVE", q), latencies)
+        # Let every phone answer, then close the question
+        await asyncio.sleep(args.answer_window + 0.2)
+        await phase_change("SKIP_TIMER", ("REVIEW", q), review_latencies)
+
+    elapsed = time.perf_counter() - t_start
+    after = process_sample(server_pid)
+    frames = stats.frames - frames_before
+
+    host_reader.cancel()
+    await host.close()
+    await asyncio.gather(*(p.close() for p in phones), return_exceptions=True)
+
+    row = {
+        "players": players,
+        "connectSeconds": round(connect_seconds, 2),
+        "startP50Ms": round(percentile(latencies, 50), 1),
+        "startP99Ms": round(percentile(latencies, 99), 1),
+        "reviewP50Ms": round(percentile(review_latencies, 50), 1),
+        "reviewP99Ms": round(percentile(review_latencies, 99), 1),
+        "framesPerSecond": round(frames / elapsed, 1),
+        "receivedMB": round(stats.bytes / 1e6, 2),
+        "serverCpuPercent": None,
+        "serverRssMB": None,
+    }
+    if before is not None and after is not None:
+        row["serverCpuPercent"] = round((after[0] - before[0]) / elapsed * 100, 1)
+        row["serverRssMB"] = round(after[1] / 1e6, 1)
+    return row
+
+
+async def drain(ws, stats: Stats):
+    try:
+        async for raw in ws:
+            stats.frames += 1
+            stats.bytes += len(raw)
+    except websockets.ConnectionClosed:
+        pass
+
+
+def print_row(row: dict):
+    cpu = "-" if row["serverCpuPercent"] is None else f"{row['serverCpuPercent']:.0f}%"
+    rss = "-" if row["serverRssMB"] is None else f"{row['serverRssMB']:.0f}"
+    print(
+        f"{row['players']:>8} {row['connectSeconds']:>9.1f} "
+        f"{row['startP50Ms']:>9.1f} {row['startP99Ms']:>9.1f} "
+        f"{row['reviewP50Ms']:>10.1f} {row['reviewP99Ms']:>10.1f} "
+        f"{row['framesPerSecond']:>9.0f} {row['receivedMB']:>7.1f} {cpu:>6} {rss:>7}"
+    )
+
+
+async def main_async(args):
+    server = None
+    base_url = args.url.rstrip("/")
+    server_pid = args.server_pid
+    if args.spawn:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = spawn_server(port)
+        server_pid = server.pid
+    try:
+        await wait_for_server(base_url)
+        print(
+            f"{args.questions} questions, answers {args.answer_dist} over {args.answer_window}s, "
+            f"seed {args.seed}, {'msgpack' if args.msgpack else 'json'}"
+        )
+        print(
+            f"{'players':>8} {'connect s':>9} {'start p50':>9} {'start p99':>9} "
+            f"{'review p50':>10} {'review p99':>10} {'frames/s':>9} {'MB recv':>7} {'cpu':>6} {'rss MB':>7}"
+        )
+        rows = []
+        for players in args.players:
+            row = await run_once(args, base_url, players, server_pid)
+            print_row(row)
+            rows.append(row)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"args": {k: v for k, v in vars(args).items() if k != "json"}, "rows": rows}, f, indent=2)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="backend base URL")
+    parser.add_argument("--spawn", action="store_true", help="start a throwaway uvicorn server instead of --url")
+    parser.add_argument("--server-pid", type=int, default=None, help="pid of the server (for CPU/RSS)")
+    parser.add_argument(
+        "--players",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[100, 500, 1000],
+        help="comma separated participant counts, one run each",
+    )
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--answer-window", type=float, default=3.0, help="seconds phones take to answer")
+    parser.add_argument("--answer-dist", choices=["uniform", "exponential", "burst"], default="uniform")
+    parser.add_argument("--correct-ratio", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0, help="max wait for every phone to see a phase")
+    parser.add_argument("--msgpack", action="store_true", help="use the MessagePack subprotocol")
+    parser.add_argument("--json", default=None, help="write the result rows to this file")
+    args = parser.parse_args(argv)
+    return args
+
+
+def main():
+    asyncio.run(main_async(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Optional, Set
+
+# Default coalescing window for state broadcasts (ms). 0 flushes on the next loop iteration.
+DEFAULT_WINDOW_MS = int(os.getenv("BROADCAST_COALESCE_MS", "100"))
+
+
+class BroadcastScheduler:
+    """
+    Coalesces bursts of state changes into at most one flush per window.
+
+    `mark_dirty()` is cheap and synchronous: the first call in a window arms a timer, later
+    calls just ride along. `flush_now()` is for phase transitions that must go out immediately;
+    it also cancels the pending timer since that flush would have nothing left to send.
+    """
+
+    def __init__(self, flush: Callable[[], Awaitable[None]], window_ms: Optional[int] = None):
+        self._flush = flush
+        self.window = max(0, DEFAULT_WINDOW_MS if window_ms is None else window_ms) / 1000.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        # Timer-started flushes, referenced until done (the loop only holds tasks weakly)
+        self._tasks: Set[asyncio.Task] = set()
+        # Stats: how many changes were requested vs how many broadcasts actually went out
+        self.requests = 0
+        self.flushes = 0
+
+    def mark_dirty(self):
+        self.requests += 1
+        if self._handle is None:
+            loop = asyncio.get_running_loop()
+            self._handle = loop.call_later(self.window, self._on_timer)
+
+    async def flush_now(self):
+        self.cancel()
+        await self._run()
+
+    def cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "flushes": self.flushes,
+            # Changes per broadcast actually sent; higher means more coalescing
+            "coalescing": round(self.requests / self.flushes, 2) if self.flushes else 0.0,
+        }
+
+    def _on_timer(self):
+        self._handle = None
+        task = asyncio.create_task(self._run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self):
+        self.flushes += 1
+        await self._flush()
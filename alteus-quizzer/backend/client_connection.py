@@ -0,0 +1,209 @@
+import asyncio
+import os
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from rate_limit import KNOWN_ACTIONS, ActionRateLimiter
+from wire import decode_message, decode_msgpack, to_msgpack
+
+# Outbound queue tuning
+# A client whose single send blocks this long (or whose queue overflows) is dropped.
+SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+MAX_QUEUE_DEPTH = int(os.getenv("WS_MAX_QUEUE_DEPTH", "64"))
+SLOW_CONSUMER_CLOSE_CODE = 4008
+# Sent to a socket whose client_id reconnected on a newer socket
+REPLACED_CLOSE_CODE = 4001
+
+# Message kinds with latest-wins semantics
+TICK = "TICK"
+# State patches can't simply be dropped (the client would see a seq gap), so a second pending
+# patch collapses the queued one into a snapshot that is rendered when it's actually sent.
+STATE = "STATE"
+
+# Background socket closes, referenced until done (the connection itself may already be gone)
+_closing: Set[asyncio.Task] = set()
+
+
+class ClientConnection:
+    """
+    One WebSocket plus its bounded outbound queue and writer task.
+
+    Broadcasters only `enqueue()` (never await the network), so a phone on bad Wi-Fi can't
+    stall the timer loop or the action handler; it only falls behind on its own queue.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        session_code: str,
+        client_id: str,
+        role: str,
+        snapshot: Optional[Callable[[], Optional[str]]] = None,
+        stats: Optional[Dict[str, int]] = None,
+        on_slow: Optional[Callable[["ClientConnection"], None]] = None,
+        binary: bool = False,
+    ):
+        self.websocket = websocket
+        self.session_code = session_code
+        self.client_id = client_id
+        self.role = role
+        # Negotiated MessagePack: frames go out as binary, actions may come in as binary
+        self.binary = binary
+        # Inbound flood protection, one token bucket per action type
+        self.limiter = ActionRateLimiter()
+        self._snapshot = snapshot
+        # Session-wide counters shared by all connections of the session
+        self.stats = stats if stats is not None else {}
+        self._on_slow = on_slow
+        # Entries are [kind, frame]; frame None means "render a snapshot at send time"
+        self._queue: Deque[list] = deque()
+        self._pending: Dict[str, list] = {}
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.sent_frames = 0
+        self.dropped_frames = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def start(self):
+        self._writer = asyncio.create_task(self._run_writer())
+
+    def enqueue(self, frame: Union[str, bytes], kind: Optional[str] = None):
+        if self.closed:
+            return
+        pending = self._pending.get(kind) if kind else None
+        if pending is not None:
+            # Latest wins: reuse the queued slot instead of growing the queue
+            pending[1] = None if kind == STATE else frame
+            self._count_drop()
+            return
+        if len(self._queue) >= MAX_QUEUE_DEPTH:
+            self._count_drop()
+            self.close_slow()
+            return
+        entry = [kind, frame]
+        self._queue.append(entry)
+        if kind:
+            self._pending[kind] = entry
+        self._wakeup.set()
+
+    async def receive(self) -> Any:
+        # Next inbound action; binary frames are MessagePack, text frames JSON. Frames that
+        # don't decode come back as None and are counted as unknown actions.
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        data = message.get("bytes")
+        try:
+            if data is not None:
+                return decode_msgpack(data) if self.binary else decode_message(data)
+            return decode_message(message.get("text") or "")
+        except (ValueError, TypeError):
+            return None
+
+    def accept_action(self, action: Any) -> bool:
+        # False (and counted) for unknown actions and for clients over their rate limit
+        if not isinstance(action, str) or action not in KNOWN_ACTIONS:
+            self.count("unknownActions")
+            return False
+        if not self.limiter.allow(action):
+            self.count("rateLimited")
+            return False
+        return True
+
+    def request_snapshot(self):
+        # Queue a full snapshot; it also absorbs any state patch still waiting to go out
+        pending = self._pending.get(STATE)
+        if pending is not None:
+            pending[1] = None
+            return
+        entry = [STATE, None]
+        self._queue.append(entry)
+        self._pending[STATE] = entry
+        self._wakeup.set()
+
+    def close_slow(self):
+        if self.closed:
+            return
+        self.count("slowConsumerDisconnects")
+        if self._on_slow is not None:
+            self._on_slow(self)
+        self.close(SLOW_CONSUMER_CLOSE_CODE, "Slow consumer")
+
+    def close(self, code: int, reason: str):
+        # Stop writing and close the socket in the background (it may be stuck)
+        self.stop()
+        task = asyncio.create_task(self._close_socket(code, reason))
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+
+    def stop(self):
+        self.closed = True
+        self._queue.clear()
+        self._pending.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    def count(self, key: str):
+        self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _count_drop(self):
+        self.dropped_frames += 1
+        self.count("droppedFrames")
+
+    async def _close_socket(self, code: int, reason: str):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code, reason=reason), timeout=1)
+        except Exception:
+            pass
+
+    async def _run_writer(self):
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                while self._queue and not self.closed:
+                    entry = self._queue.popleft()
+                    kind, frame = entry
+                    if kind and self._pending.get(kind) is entry:
+                        del self._pending[kind]
+                    if frame is None:
+                        # None from the provider: the snapshot will arrive as a separate frame
+                        frame = self._snapshot() if self._snapshot is not None else None
+                        if frame is None:
+                            continue
+                    if self.binary and isinstance(frame, str):
+                        frame = to_msgpack(frame)
+                    try:
+                        if isinstance(frame, bytes):
+                            await asyncio.wait_for(self.websocket.send_bytes(frame), timeout=SEND_TIMEOUT_SECONDS)
+                        else:
+                            await asyncio.wait_for(self.websocket.send_text(frame), timeout=SEND_TIMEOUT_SECONDS)
+                    except asyncio.TimeoutError:
+                        self.close_slow()
+                        return
+                    except Exception:
+                        # Socket already gone; the endpoint's receive loop does the cleanup
+                        self.stop()
+                        return
+                    self.sent_frames += 1
+                self._wakeup.clear()
+        except asyncio.CancelledError:
+            pass
+
+
+def connection_stats(connections: List[ClientConnection], counters: Dict[str, int]) -> dict:
+    depths = [c.queue_depth for c in connections]
+    return {
+        "connections": len(connections),
+        "queueDepth": sum(depths),
+        "maxQueueDepth": max(depths, default=0),
+        "droppedFrames": counters.get("droppedFrames", 0),
+        "slowConsumerDisconnects": counters.get("slowConsumerDisconnects", 0),
+        "rateLimited": counters.get("rateLimited", 0),
+        "unknownActions": counters.get("unknownActions", 0),
+    }
@@ -35,7 +35,7 @@ async def init_db():
             # the column already exists under different casing/schema settings.
             pass
 
-        # Ensure Alteus override columns exist on `appsettings` for older databases.
+        # Ensure Alteus override and auto-advance columns exist on `appsettings` for older databases.
         try:
             cols_res = await conn.exec_driver_sql(
                 """
@@ -51,6 +51,28 @@ async def init_db():
                 await conn.exec_driver_sql("ALTER TABLE appsettings ADD COLUMN alteus_api_key TEXT")
             if "alteus_endpoint_id" not in existing_cols:
                 await conn.exec_driver_sql("ALTER TABLE appsettings ADD COLUMN alteus_endpoint_id TEXT")
+            if "auto_advance" not in existing_cols:
+                await conn.exec_driver_sql("ALTER TABLE appsettings ADD COLUMN auto_advance BOOLEAN NOT NULL DEFAULT FALSE")
+            if "auto_advance_grace_seconds" not in existing_cols:
+                await conn.exec_driver_sql("ALTER TABLE appsettings ADD COLUMN auto_advance_grace_seconds INTEGER NOT NULL DEFAULT 2")
+        except Exception:
+            # Best-effort; don't block startup if schema inspection isn't available.
+            pass
+
+        # Ensure live-game persistence columns exist for older databases.
+        try:
+            cols_res = await conn.exec_driver_sql(
+                """
+                SELECT table_name, column_name
+                FROM information_schema.columns
+                WHERE table_name IN ('session', 'participant')
+                """
+            )
+            existing_cols = {(row[0], row[1]) for row in (cols_res.all() or [])}
+            if ("session", "live_state") not in existing_cols:
+                await conn.exec_driver_sql("ALTER TABLE session ADD COLUMN live_state TEXT")
+            if ("participant", "client_id") not in existing_cols:
+                await conn.exec_driver_sql("ALTER TABLE participant ADD COLUMN client_id VARCHAR")
         except Exception:
             # Best-effort; don't block startup if schema inspection isn't available.
             pass
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Max commands waiting for one game; producers wait (backpressure) once it's full
+GAME_QUEUE_DEPTH = int(os.getenv("GAME_QUEUE_DEPTH", "1024"))
+# Max commands applied together before the game publishes its state
+GAME_MAX_BATCH = int(os.getenv("GAME_MAX_BATCH", "256"))
+
+
+class GameActor:
+    """
+    Single writer of one game.
+
+    Every mutation (player actions, connects/disconnects, timer expiry) is a command in one
+    bounded queue, applied in arrival order by one task. Whatever queued up while the previous
+    batch was being applied is drained as the next batch, so an answer storm turns into a few
+    large batches, each followed by one publish.
+    """
+
+    def __init__(
+        self,
+        apply_batch: Callable[[List[dict]], Awaitable[None]],
+        maxsize: Optional[int] = None,
+        max_batch: Optional[int] = None,
+    ):
+        self._apply_batch = apply_batch
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=GAME_QUEUE_DEPTH if maxsize is None else maxsize)
+        self.max_batch = GAME_MAX_BATCH if max_batch is None else max_batch
+        self._task: Optional[asyncio.Task] = None
+        # Throughput stats
+        self.commands = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.max_queue_depth = 0
+        self.busy_seconds = 0.0
+
+    async def submit(self, command: dict):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        await self._queue.put(command)
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "queueDepth": self._queue.qsize(),
+            "maxQueueDepth": self.max_queue_depth,
+            "commands": self.commands,
+            "batches": self.batches,
+            "largestBatch": self.largest_batch,
+            "busySeconds": round(self.busy_seconds, 3),
+        }
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            started = time.perf_counter()
+            try:
+                await self._apply_batch(batch)
+            except Exception:
+                # A bad command must not take the whole game down
+                logger.exception("Applying %d game command(s) failed", len(batch))
+            finally:
+                self.busy_seconds += time.perf_counter() - started
+                self.commands += len(batch)
+                self.batches += 1
+                self.largest_batch = max(self.largest_batch, len(batch))
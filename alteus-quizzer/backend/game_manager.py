@@ -1,231 +1,1082 @@
 import asyncio
-import json
-from typing import Dict, List, Optional
+import logging
+import math
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
 from fastapi import WebSocket
 
+from wire import MSGPACK_SUBPROTOCOL, encode_message, to_msgpack, with_field
+from state_sync import (
+    HOST_VIEW,
+    PARTICIPANT_VIEW,
+    PRESENTER_VIEW,
+    VIEWS,
+    ViewChannel,
+    me_message,
+)
+from broadcast_scheduler import BroadcastScheduler
+from game_actor import GameActor
+from timer_scheduler import TimerEntry, TimerScheduler
+from client_connection import REPLACED_CLOSE_CODE, STATE, TICK, ClientConnection, connection_stats
+from session_bus import create_session_bus
+from persistence import GameJournal
+from session_reaper import SessionReaper, deep_sizeof
+from quiz_runtime import CompiledQuiz, compile_quiz, normalize_option_id
+from leaderboard import Leaderboard
+from scoring import NO_ANSWER, UNKNOWN, AnswerColumns, score_columns
+from participant_store import ParticipantTable
+from media_proxy import MediaCache
+
+logger = logging.getLogger(__name__)
+
+# Clients render the countdown from the published deadline; TICKs only re-anchor them.
+# 0 disables the periodic resync entirely.
+TIMER_RESYNC_SECONDS = float(os.getenv("TIMER_RESYNC_SECONDS", "5"))
+
+# Leaderboard shipped to host/presenter after each question (the "top_3" setting caps it at 3),
+# and how many neighbours above/below a phone sees around its own rank
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "10"))
+LEADERBOARD_AROUND = int(os.getenv("LEADERBOARD_AROUND", "2"))
+
+
+# JOIN input is cut to these lengths before it is stored and sent to every screen
+MAX_PLAYER_NAME_LENGTH = 32
+MAX_COLOR_LENGTH = 32
+
+# Close code for sockets of a session that ended or was evicted (same as "Session not found")
+SESSION_CLOSED_CODE = 4000
+# Close code for sockets of a session another worker took over ("Service Restart": reconnect)
+SESSION_MOVED_CODE = 1012
+
+
+# Fire-and-forget work (timer expiry, ticks, media prefetch, remote snapshots). The loop only
+# keeps weak references to tasks, so they're held here until done.
+_background: Set[asyncio.Task] = set()
+
+
+def spawn(coro: Awaitable) -> asyncio.Task:
+    task = asyncio.ensure_future(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return task
+
+
+def server_now_ms() -> int:
+    # Clock published to clients (deadlines, CLOCK_SYNC). Wall clock rather than monotonic so
+    # every worker/node answers CLOCK_SYNC consistently; expiry itself runs on monotonic time.
+    return int(time.time() * 1000)
+
+
+def reported_ms(value) -> float:
+    # A client-reported time in ms (latency data for analytics), UNKNOWN unless a finite number
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        return UNKNOWN
+    return float(value)
+
+
+def _known(value: float) -> Optional[float]:
+    # UNKNOWN (NaN) is not valid JSON
+    return None if math.isnan(value) else value
+
+
+def client_role(client_id: str) -> str:
+    # "host" drives the game, "presenter"/"presenter-*" are read-only screens, everyone else plays
+    if client_id == "host":
+        return HOST_VIEW
+    if client_id == "presenter" or client_id.startswith("presenter-"):
+        return PRESENTER_VIEW
+    return PARTICIPANT_VIEW
+
+
+class SessionConnections:
+    """
+    Live sockets of one session, indexed by connection identity and by role.
+
+    All add/remove operations are dict operations; `client_id` indexes always point at the
+    newest socket for that id.
+    """
+
+    def __init__(self, session_code: str):
+        self.session_code = session_code
+        self.connections: Dict[ClientConnection, None] = {}
+        self.host: Optional[ClientConnection] = None
+        self.presenters: Dict[str, ClientConnection] = {}
+        self.participants: Dict[str, ClientConnection] = {}
+        # Outbound counters (dropped frames, slow-consumer disconnects)
+        self.counters: Dict[str, int] = {}
+
+    def current(self, role: str, client_id: str) -> Optional[ClientConnection]:
+        if role == HOST_VIEW:
+            return self.host
+        if role == PRESENTER_VIEW:
+            return self.presenters.get(client_id)
+        return self.participants.get(client_id)
+
+    def index(self, connection: ClientConnection):
+        if connection.role == HOST_VIEW:
+            self.host = connection
+        elif connection.role == PRESENTER_VIEW:
+            self.presenters[connection.client_id] = connection
+        else:
+            self.participants[connection.client_id] = connection
+
+    def unindex(self, connection: ClientConnection):
+        if connection.role == HOST_VIEW:
+            self.host = None
+        elif connection.role == PRESENTER_VIEW:
+            del self.presenters[connection.client_id]
+        else:
+            del self.participants[connection.client_id]
+
+
 class ConnectionManager:
     def __init__(self):
-        # session_code -> List[WebSocket]
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-        # session_code -> {participant_id: WebSocket}
-        self.participant_connections: Dict[str, Dict[str, WebSocket]] = {}
-        # session_code -> host_websocket
-        self.host_connections: Dict[str, WebSocket] = {}
-
-    async def connect(self, websocket: WebSocket, session_code: str, client_id: str, is_host: bool = False):
-        await websocket.accept()
-        if session_code not in self.active_connections:
-            self.active_connections[session_code] = []
-            self.participant_connections[session_code] = {}
-        
-        self.active_connections[session_code].append(websocket)
-        
-        if is_host:
-            self.host_connections[session_code] = websocket
+        # session_code -> SessionConnections; dropped as soon as its last socket leaves
+        self.sessions: Dict[str, SessionConnections] = {}
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        session_code: str,
+        client_id: str,
+        role: str = PARTICIPANT_VIEW,
+        snapshot: Optional[Callable[[], Optional[str]]] = None,
+        subprotocol: Optional[str] = None,
+    ) -> ClientConnection:
+        await websocket.accept(subprotocol=subprotocol)
+        session = self.ensure_session(session_code)
+        connection = ClientConnection(
+            websocket,
+            session_code,
+            client_id,
+            role,
+            snapshot=snapshot,
+            stats=session.counters,
+            on_slow=self.disconnect,
+            binary=subprotocol == MSGPACK_SUBPROTOCOL,
+        )
+
+        # Same client_id reconnecting (new tab, flaky Wi-Fi): the newest socket wins and the
+        # stale one is closed so it can't shadow it or remove it on its way out.
+        stale = session.current(role, client_id)
+        if stale is not None:
+            del session.connections[stale]
+            stale.close(REPLACED_CLOSE_CODE, "Replaced by a newer connection")
+
+        connection.start()
+        session.connections[connection] = None
+        session.index(connection)
+        return connection
+
+    def disconnect(self, connection: ClientConnection):
+        # Idempotent: replaced or already-dropped sockets are simply ignored
+        connection.stop()
+        session = self.sessions.get(connection.session_code)
+        if session is None or connection not in session.connections:
+            return
+        del session.connections[connection]
+        if session.current(connection.role, connection.client_id) is connection:
+            session.unindex(connection)
+        if not session.connections:
+            del self.sessions[connection.session_code]
+
+    def ensure_session(self, session_code: str) -> SessionConnections:
+        session = self.sessions.get(session_code)
+        if session is None:
+            session = self.sessions[session_code] = SessionConnections(session_code)
+        return session
+
+    def drop_session(self, session_code: str):
+        # Stop every writer task of a session that is going away
+        session = self.sessions.pop(session_code, None)
+        if session is not None:
+            for connection in session.connections:
+                connection.stop()
+
+    def close_session(self, session_code: str, reason: str, code: int = SESSION_CLOSED_CODE):
+        session = self.sessions.pop(session_code, None)
+        if session is not None:
+            for connection in list(session.connections):
+                connection.close(code, reason)
+
+    def session_stats(self, session_code: str) -> dict:
+        session = self.sessions.get(session_code)
+        if session is None:
+            return connection_stats([], {})
+        return connection_stats(list(session.connections), session.counters)
+
+    def deliver(self, session_code: str, envelope: dict):
+        """
+        Hand an owner's fanout envelope to this worker's local sockets. Only queues; each
+        connection's writer task does the actual (possibly slow) send.
+
+        Envelope keys (all optional):
+        - "all" + "kind": one frame for every socket (e.g. TICK)
+        - "views": {"host"|"presenter": frame}
+        - "participants": shared participant frame; "personal": {client_id: frame} overrides it
+        - "direct": [[role, client_id, frame], ...] for one specific client (snapshots)
+        - "close": reason; the session is gone, close all of its sockets
+        """
+        session = self.sessions.get(session_code)
+        if session is None:
+            return
+        if "close" in envelope:
+            self.close_session(session_code, envelope["close"])
+            return
+
+        # MessagePack clients: transcode each frame once, not once per socket
+        transcoded: Dict[str, bytes] = {}
+
+        def framed(connection: ClientConnection, frame: str):
+            if not connection.binary:
+                return frame
+            encoded = transcoded.get(frame)
+            if encoded is None:
+                encoded = transcoded[frame] = to_msgpack(frame)
+            return encoded
+
+        if "all" in envelope:
+            kind = envelope.get("kind")
+            for connection in list(session.connections):
+                connection.enqueue(framed(connection, envelope["all"]), kind)
+        views = envelope.get("views") or {}
+        if HOST_VIEW in views and session.host is not None:
+            session.host.enqueue(framed(session.host, views[HOST_VIEW]), STATE)
+        if PRESENTER_VIEW in views:
+            for connection in list(session.presenters.values()):
+                connection.enqueue(framed(connection, views[PRESENTER_VIEW]), STATE)
+        shared = envelope.get("participants")
+        personal = envelope.get("personal") or {}
+        if shared is not None:
+            for client_id, connection in list(session.participants.items()):
+                connection.enqueue(framed(connection, personal.get(client_id, shared)), STATE)
         else:
-            self.participant_connections[session_code][client_id] = websocket
-
-    def disconnect(self, websocket: WebSocket, session_code: str, client_id: str, is_host: bool = False):
-        if session_code in self.active_connections:
-            if websocket in self.active_connections[session_code]:
-                self.active_connections[session_code].remove(websocket)
-            
-            if is_host and session_code in self.host_connections:
-                del self.host_connections[session_code]
-            elif client_id in self.participant_connections.get(session_code, {}):
-                del self.participant_connections[session_code][client_id]
-
-    async def broadcast(self, session_code: str, message: dict):
-        if session_code in self.active_connections:
-            # Create a list of tasks for sending messages
-            tasks = []
-            # Copy list to avoid issues if disconnection happens during iteration
-            for connection in self.active_connections[session_code][:]: 
-                tasks.append(connection.send_json(message))
-            
-            # Run all send operations concurrently
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+            for client_id, frame in personal.items():
+                connection = session.participants.get(client_id)
+                if connection is not None:
+                    connection.enqueue(framed(connection, frame), STATE)
+        for role, client_id, frame in envelope.get("direct") or []:
+            connection = session.current(role, client_id)
+            if connection is not None:
+                connection.enqueue(frame)
 
 class ActiveGame:
-    def __init__(self, quiz_data: dict, session_code: str, settings: Optional[dict] = None):
-        self.quiz = quiz_data
+    def __init__(self, quiz: CompiledQuiz, session_code: str, settings: Optional[dict] = None):
+        self.quiz = quiz
         self.session_code = session_code
         self.settings = settings or {}
         self.points_system = (self.settings.get("pointsSystem") or "standard").strip()
         self.leaderboard_frequency = (self.settings.get("leaderboardFrequency") or "every_round").strip()
+        # Close the question early, after a short grace period, once every connected player answered
+        self.auto_advance = bool(self.settings.get("autoAdvance", False))
+        self.auto_advance_grace = max(0.0, float(self.settings.get("autoAdvanceGraceSeconds") or 0))
         self.status = "WAITING" # WAITING, ACTIVE, REVIEW, FINISHED
         self.current_question_index = 0
-        self.participants: Dict[str, dict] = {} # id -> {name, color, score}
-        # participant_id -> {"answer_id": str, "time_remaining": int}
-        self.answers: Dict[str, dict] = {}
-        # last awarded points (for current review), participant_id -> points
-        self.last_awards: Dict[str, int] = {}
-        self.timer_task = None
-        self.time_remaining = 0
-
-    def add_participant(self, p_id: str, name: str, color: str):
-        if p_id not in self.participants:
-            self.participants[p_id] = {"name": name, "color": color, "score": 0}
+        # Roster (name, color, score, answer time) by dense player slot
+        self.participants = ParticipantTable()
+        # Answers to the running question and the points they earned, by player slot
+        self.answers = AnswerColumns()
+        # Answers given by currently connected players ("answersReceived"), kept up to date
+        self._answered_connected = 0
+        # Connected players who have joined; phones still on the join screen don't count
+        self._joined_connected = 0
+        # Published form of the last awards, participant_id -> points (built once per question)
+        self._awards_view: Optional[Dict[str, int]] = None
+        # Ranking by score, kept up to date as scores change
+        self.leaderboard = Leaderboard()
+        # Next wake-up of this game in the shared scheduler (deadline or TICK resync)
+        self.timer: Optional[TimerEntry] = None
+        # Deadline of the running question: monotonic (drives expiry) and server-clock ms (published)
+        self.deadline: Optional[float] = None
+        self.deadline_epoch_ms: Optional[int] = None
+        # Start of the running question, same two clocks; answers are timed against it
+        self.question_started: Optional[float] = None
+        self.question_started_ms: Optional[int] = None
+        # Live sockets per participant id across all workers (reported by CONNECT/DISCONNECT)
+        self.connected: Dict[str, int] = {}
+        # Live host/presenter sockets
+        self.screens = 0
+        # Time of the last command (monotonic), for idle eviction
+        self.last_activity = time.monotonic()
+        # Delta protocol bookkeeping: one seq stream per view, plus participants whose
+        # roster entry or own score/award changed (or who left) since the last flush.
+        self._dirty_participants: set = set()
+        self._removed_participants: set = set()
+        # Ranks were (re)published or hidden: every phone gets a fresh "me" on the next flush
+        self._refresh_me = False
+        self.channels: Dict[str, ViewChannel] = {view: ViewChannel(view, self.view_fields(view)) for view in VIEWS}
+        # Bursts of answers/joins are coalesced into one patch per window
+        self.broadcaster = BroadcastScheduler(self.broadcast_state)
+        # All mutations go through this queue and are applied by one task, in order
+        self.actor = GameActor(self.apply_commands)
+        # Valid actions that changed nothing (repeated JOIN, re-sent or late answer, wrong phase)
+        self.dropped_actions = 0
+        # Invalid actions (wrong role, answer from a player who never joined, unknown option)
+        self.rejected_actions = 0
+        # Commands that raised while being applied
+        self.failed_commands = 0
 
-    def remove_participant(self, p_id: str):
+    def to_snapshot(self) -> dict:
+        # Everything needed to resume the game in another process (see GameJournal)
+        return {
+            "sessionCode": self.session_code,
+            "quiz": self.quiz.to_dict(),
+            "settings": self.settings,
+            "status": self.status,
+            "currentQuestionIndex": self.current_question_index,
+            "participants": self.participants.to_dict(),
+            "answers": self._answers_snapshot(),
+            "lastAwards": self.last_awards(),
+            "answerTimes": self.participants.answer_times(),
+            "deadline": self.deadline_epoch_ms,
+            "questionStarted": self.question_started_ms,
+            "seqs": {view: channel.seq for view, channel in self.channels.items()},
+            "savedAt": server_now_ms(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "ActiveGame":
+        game = cls(compile_quiz(snapshot["quiz"]), snapshot["sessionCode"], settings=snapshot.get("settings"))
+        game.status = snapshot["status"]
+        game.current_question_index = snapshot["currentQuestionIndex"]
+        game.participants = ParticipantTable.from_dict(snapshot["participants"], snapshot.get("answerTimes"))
+        question = game.quiz.question(game.current_question_index)
+        game.answers.clear(question)
+        for p_id, answer in snapshot["answers"].items():
+            slot = game.participants.slot(p_id)
+            option_index = question.option_index.get(answer["answer_id"]) if question is not None else None
+            if slot is not None and option_index is not None:
+                game.answers.set(
+                    slot,
+                    option_index,
+                    answer["time_remaining"],
+                    reported_ms(answer.get("clientMs")),
+                    reported_ms(answer.get("rttMs")),
+                )
+        for p_id, points in snapshot["lastAwards"].items():
+            slot = game.participants.slot(p_id)
+            if slot is not None:
+                game.answers.set_award(slot, points)
+        for p_id in game.participants:
+            game._update_rank(p_id)
+        if game.status == "ACTIVE" and snapshot.get("deadline") is not None:
+            # Whatever is left of the question (possibly nothing) counts from now
+            game._set_deadline(max(0.0, (snapshot["deadline"] - server_now_ms()) / 1000.0))
+            game._mark_question_start(snapshot.get("questionStarted"))
+        # Continue the seq streams; reconnecting clients start from a fresh snapshot anyway
+        seqs = snapshot.get("seqs") or {}
+        for view, channel in game.channels.items():
+            channel.seq = seqs.get(view, 0)
+            channel.fields = game.view_fields(view)
+        return game
+
+    def resume(self):
+        # Restart the question timer of a restored game; an expired one goes to REVIEW at once
+        if self.status == "ACTIVE":
+            self._schedule_timer()
+
+    def add_participant(self, p_id: str, name: str, color: str) -> bool:
+        # False for a repeated JOIN (reconnects re-send it); the existing entry is kept
         if p_id in self.participants:
-            del self.participants[p_id]
-            if p_id in self.answers:
-                del self.answers[p_id]
+            return False
+        self.participants.add(p_id, name, color)
+        if p_id in self.connected:
+            self._joined_connected += 1
+        self._update_rank(p_id)
+        self._dirty_participants.add(p_id)
+        self._removed_participants.discard(p_id)
+        return True
+
+    def remove_participant(self, p_id: str):
+        slot = self.participants.remove(p_id)
+        if slot is not None:
+            if p_id in self.connected:
+                self._joined_connected -= 1
+                if self.answers.option(slot) != NO_ANSWER:
+                    self._answered_connected -= 1
+            # The slot may be reused by the next player who joins
+            self.answers.discard(slot)
+            self._awards_view = None
+            self.leaderboard.remove(p_id)
+            self._dirty_participants.discard(p_id)
+            self._removed_participants.add(p_id)
 
     def prune_participants(self, active_ids: List[str]):
         # Remove participants who are not in the active_ids list
         # We need to be careful: self.participants keys are client_ids
         # active_ids should be list of connected client_ids for this session
         
-        current_ids = list(self.participants.keys())
+        current_ids = list(self.participants)
         for pid in current_ids:
             if pid not in active_ids:
                 self.remove_participant(pid)
 
+    def client_connected(self, client_id: str, role: str):
+        if role == PARTICIPANT_VIEW:
+            if client_id not in self.connected and client_id in self.participants:
+                self._joined_connected += 1
+                if self._has_answered(client_id):
+                    self._answered_connected += 1
+            self.connected[client_id] = self.connected.get(client_id, 0) + 1
+        else:
+            self.screens += 1
+
+    def client_disconnected(self, client_id: str, role: str) -> bool:
+        # True when that was the participant's last socket (a replaced socket doesn't count)
+        if role != PARTICIPANT_VIEW:
+            self.screens = max(0, self.screens - 1)
+            return False
+        if client_id not in self.connected:
+            return False
+        self.connected[client_id] -= 1
+        if self.connected[client_id] > 0:
+            return False
+        del self.connected[client_id]
+        if client_id in self.participants:
+            self._joined_connected -= 1
+            if self._has_answered(client_id):
+                self._answered_connected -= 1
+        return True
+
+    def _has_answered(self, p_id: str) -> bool:
+        slot = self.participants.slot(p_id)
+        return slot is not None and self.answers.option(slot) != NO_ANSWER
+
+    def has_clients(self) -> bool:
+        return bool(self.connected) or self.screens > 0
+
+    def estimated_size(self) -> int:
+        # Approximate bytes held by this game (quiz, roster, answers, cached view frames)
+        seen: set = set()
+        parts = [self.quiz, self.settings, self.participants, self.answers, self._awards_view, self.connected, self.leaderboard]
+        parts.extend(vars(channel) for channel in self.channels.values())
+        return sum(deep_sizeof(part, seen) for part in parts)
+
+    def handle_action(self, client_id: str, role: str, data: dict, received_at: Optional[float] = None) -> bool:
+        # Apply one inbound action; returns False if it changed nothing (no broadcast needed).
+        # `received_at` is when this worker got it (monotonic), before it waited in the queue.
+        action = data.get("action")
+        
+        if role == HOST_VIEW:
+            if action == "START_GAME":
+                self.start_game()
+                return True
+            elif action == "NEXT_QUESTION":
+                self.next_question()
+                return True
+            elif action == "SKIP_TIMER":
+                return self.skip_timer()
+            elif action == "RESET":
+                self.reset_game()
+                # Prune disconnected players
+                self.prune_participants(list(self.connected.keys()))
+                return True
+        elif role == PARTICIPANT_VIEW:
+            if action == "JOIN":
+                # Raw client input: anything that isn't a string falls back to the defaults
+                name = data.get("name")
+                color = data.get("color")
+                name = name.strip()[:MAX_PLAYER_NAME_LENGTH] if isinstance(name, str) else ""
+                color = color.strip()[:MAX_COLOR_LENGTH] if isinstance(color, str) else ""
+                name = name or "Anonymous"
+                color = color or "#000000"
+                return self.add_participant(client_id, name, color)
+            elif action == "SUBMIT_ANSWER":
+                answer_id = data.get("answerId")
+                return self.submit_answer(client_id, answer_id, received_at, data.get("sentAt"), data.get("rtt"))
+
+        # Not an action this role may send
+        return self._reject()
+
+    def _reject(self) -> bool:
+        # An invalid action: counted apart from valid ones that just changed nothing
+        self.rejected_actions += 1
+        return False
+
     def start_game(self):
         self.status = "ACTIVE"
         self.current_question_index = 0
+        self._clear_answers()
         self.start_question_timer()
 
     def next_question(self):
-        if self.current_question_index < len(self.quiz['questions']) - 1:
+        if self.current_question_index < len(self.quiz) - 1:
             self.current_question_index += 1
             self.status = "ACTIVE"
-            self.answers = {} # Reset answers
-            self.last_awards = {}
+            self._dirty_participants.update(self.last_awards())
+            self._clear_answers()
+            # Ranks are only shown between questions
+            self._refresh_me = True
             self.start_question_timer()
         else:
             self.status = "FINISHED"
+            self._cancel_timer()
 
-    def submit_answer(self, p_id: str, answer_id: str):
-        if self.status == "ACTIVE":
-            # Store the server-side time remaining for speed bonus calculations
-            self.answers[p_id] = {"answer_id": answer_id, "time_remaining": int(self.time_remaining or 0)}
+    def submit_answer(
+        self,
+        p_id: str,
+        answer_id,
+        received_at: Optional[float] = None,
+        sent_at=None,
+        rtt=None,
+    ) -> bool:
+        # Answers are timed by when the server received them, not when the queue got to them
+        if received_at is None:
+            received_at = time.monotonic()
+        if self.status != "ACTIVE" or self.deadline is None:
+            return False
+        # Late answers (received after the deadline) don't count, nor ones that were sent
+        # before this question started
+        if received_at >= self.deadline or received_at < self.question_started:
+            return False
+        # Against the full time limit, even if the deadline was brought forward (auto-advance)
+        question = self.quiz.questions[self.current_question_index]
+        time_remaining = question.time_limit - (received_at - self.question_started)
+        slot = self.participants.slot(p_id)
+        if slot is None:
+            # Only players who joined can answer
+            return self._reject()
+        answer_id = normalize_option_id(answer_id)
+        option_index = question.option_index.get(answer_id)
+        if option_index is None:
+            # Not an option of the running question (stale or forged)
+            return self._reject()
+        if self.answers.option(slot) == option_index:
+            # Re-sent (double tap, retry): keep the original answer time
+            return False
+        if self.answers.option(slot) == NO_ANSWER and p_id in self.connected:
+            self._answered_connected += 1
+        # Store the server-side time remaining, to the millisecond, for speed bonus calculations
+        # (the answer distribution is updated along with it). What the client reports (when it
+        # was tapped by its synced clock, its round trip) is only kept for analytics.
+        client_ms = reported_ms(sent_at)
+        if self.question_started_ms is not None:
+            client_ms -= self.question_started_ms
+        rtt_ms = reported_ms(rtt)
+        if rtt_ms < 0:
+            rtt_ms = UNKNOWN
+        self.answers.set(slot, option_index, round(time_remaining, 3), client_ms, rtt_ms)
+        return True
 
-    def skip_timer(self):
-        if self.status == "ACTIVE":
-            self.time_remaining = 0
-            # The timer loop will see 0, break, and trigger REVIEW transition
+    def _clear_answers(self):
+        self.answers.clear(self.quiz.question(self.current_question_index))
+        self._answered_connected = 0
+        self._awards_view = None
+
+    def _answers_snapshot(self) -> Dict[str, dict]:
+        # participant_id -> {"answer_id", "time_remaining"} (snapshot form)
+        question = self.quiz.question(self.current_question_index)
+        if question is None:
+            return {}
+        ids = self.participants.ids
+        answers = self.answers
+        return {
+            ids[slot]: {
+                "answer_id": question.option_ids[answers.options[slot]],
+                "time_remaining": answers.remaining[slot],
+                "clientMs": _known(answers.client_ms[slot]),
+                "rttMs": _known(answers.rtt_ms[slot]),
+            }
+            for slot in answers.answered_slots()
+        }
+
+    def answer_timings(self) -> List[dict]:
+        # Per-answer timing of the running (or just scored) question, for analytics: server
+        # receive time and what the client reported, all in ms since the question started
+        question = self.quiz.question(self.current_question_index)
+        if question is None:
+            return []
+        ids = self.participants.ids
+        answers = self.answers
+        return [
+            {
+                "id": ids[slot],
+                "answerId": question.option_ids[answers.options[slot]],
+                "receivedMs": round((question.time_limit - answers.remaining[slot]) * 1000),
+                "clientMs": _known(answers.client_ms[slot]),
+                "rttMs": _known(answers.rtt_ms[slot]),
+                "points": answers.award(slot),
+            }
+            for slot in answers.answered_slots()
+        ]
+
+    def last_awards(self) -> Dict[str, int]:
+        # Points awarded for the last scored question, participant_id -> points
+        if self._awards_view is None:
+            ids = self.participants.ids
+            self._awards_view = {ids[slot]: self.answers.awards[slot] for slot in self.answers.awarded_slots()}
+        return self._awards_view
+
+    def skip_timer(self) -> bool:
+        if self.status != "ACTIVE":
+            return False
+        # Already on the game's single writer: end the question here instead of via the timer
+        self._set_deadline(0)
+        self._end_question()
+        return True
 
     def reset_game(self):
         self.status = "WAITING"
         self.current_question_index = 0
-        self.answers = {}
-        self.last_awards = {}
-        for p in self.participants.values():
-            p['score'] = 0
-        self.time_remaining = 0
+        self._dirty_participants.update(self.last_awards())
+        self._clear_answers()
+        self._dirty_participants.update(self.participants.reset_scores())
+        self.leaderboard.clear()
+        for p_id in self.participants:
+            self._update_rank(p_id)
+        self._refresh_me = True
+        self.deadline = None
+        self.deadline_epoch_ms = None
+        self.question_started = None
+        self.question_started_ms = None
+        self._cancel_timer()
+
+    @property
+    def time_remaining(self) -> int:
+        # Whole seconds left, as the old per-second counter reported it
+        if self.status != "ACTIVE" or self.deadline is None:
+            return 0
+        return max(0, math.ceil(self.deadline - time.monotonic()))
+
+    def deadline_ms(self) -> Optional[int]:
+        if self.status != "ACTIVE":
+            return None
+        return self.deadline_epoch_ms
+
+    def _set_deadline(self, seconds: float):
+        self.deadline = time.monotonic() + seconds
+        self.deadline_epoch_ms = server_now_ms() + int(seconds * 1000)
+
+    def _mark_question_start(self, started_ms: Optional[int] = None):
+        # The running question started its full time limit before the deadline, unless we
+        # know better (restored after the deadline was brought forward)
+        if started_ms is None:
+            time_limit = self.quiz.questions[self.current_question_index].time_limit
+            self.question_started = self.deadline - time_limit
+            self.question_started_ms = self.deadline_epoch_ms - time_limit * 1000
+        else:
+            self.question_started = time.monotonic() - (server_now_ms() - started_ms) / 1000.0
+            self.question_started_ms = started_ms
+
+    def everyone_answered(self) -> bool:
+        # O(1): both counts are kept up to date by joins, submit_answer and (dis)connects. Only
+        # players who joined are waited for; a phone left on the join screen can't answer.
+        return self._joined_connected > 0 and self._answered_connected >= self._joined_connected
+
+    def _check_auto_advance(self) -> bool:
+        # Everyone connected has answered: bring the deadline forward to the grace period. The
+        # question then ends through the usual timer expiry; answers can still change until then.
+        if not self.auto_advance or self.status != "ACTIVE" or self.deadline is None:
+            return False
+        if not self.everyone_answered():
+            return False
+        if self.deadline - time.monotonic() <= self.auto_advance_grace:
+            return False
+        self._set_deadline(self.auto_advance_grace)
+        self._schedule_timer()
+        return True
 
     def start_question_timer(self):
-        question = self.quiz['questions'][self.current_question_index]
-        self.time_remaining = question['time_limit']
-        if self.timer_task:
-            self.timer_task.cancel()
-        self.timer_task = asyncio.create_task(self._timer_loop())
-
-    async def _timer_loop(self):
-        while self.time_remaining > 0 and self.status == "ACTIVE":
-            await asyncio.sleep(1)
-            self.time_remaining -= 1
-            # We could broadcast tick here, or just let clients handle it and sync occasionally
-            # For robustness, let's broadcast every sec or so, or just rely on initial sync + client clock.
-            # But broadcasting is safer for sync.
-            await manager.broadcast(self.session_code, {"type": "TICK", "timeRemaining": self.time_remaining})
-        
-        if self.status == "ACTIVE":
-            self.status = "REVIEW"
-            self.calculate_scores()
-            await manager.broadcast(self.session_code, {"type": "STATE_UPDATE", "state": self.get_state()})
+        question = self.quiz.questions[self.current_question_index]
+        self._set_deadline(question.time_limit)
+        self._mark_question_start()
+        self._schedule_timer()
 
-    def calculate_scores(self):
-        question = self.quiz['questions'][self.current_question_index]
-        # Find correct option ids
-        correct_ids = [opt['id'] for opt in question['options'] if opt.get('is_correct')]
-        
-        # In our simple model, maybe just one correct answer? 
-        # The prompt implies potentially multiple, but usually one. 
-        # Let's assume standard multiple choice where one is correct for now, or match any.
-        
-        self.last_awards = {}
-        for p_id, payload in self.answers.items():
-            ans_id = payload.get("answer_id")
-            ans_time_remaining = int(payload.get("time_remaining") or 0)
-            # Check if ans_id matches any correct option (assuming ans_id is the option ID)
-            # We need to map options to find which is correct.
-            # Actually, `questions` structure needs to be consistent.
-            # We will use the ID from the database for options.
-
-            # Simple check:
-            is_correct = any(
-                str(opt.get("id")) == str(ans_id) and opt.get("is_correct")
-                for opt in question["options"]
+    def _cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def _schedule_timer(self):
+        # Wake up at the deadline, or earlier for a TICK every TIMER_RESYNC_SECONDS that
+        # re-anchors the clients' local countdown against the server clock
+        self._cancel_timer()
+        when = self.deadline
+        if TIMER_RESYNC_SECONDS > 0:
+            when = min(when, time.monotonic() + TIMER_RESYNC_SECONDS)
+        self.timer = timers.call_at(when, self._on_timer)
+
+    def _on_timer(self):
+        self.timer = None
+        if self.status != "ACTIVE" or self.deadline is None:
+            return
+        if time.monotonic() >= self.deadline:
+            # Expiry is a command like any other, so it's ordered with the answers around it
+            spawn(
+                self.actor.submit({"type": "TIMER_EXPIRED", "questionIndex": self.current_question_index})
+            )
+            return
+        if TIMER_RESYNC_SECONDS > 0:
+            spawn(
+                bus.publish(self.session_code, {"all": encode_message(self.tick_message()), "kind": TICK})
             )
+        self._schedule_timer()
+
+    def expire_question(self, question_index: int):
+        # Ignore an expiry that lost the race against NEXT_QUESTION/RESET or a restarted timer
+        if self.status != "ACTIVE" or self.current_question_index != question_index:
+            return
+        if self.deadline is not None and self.deadline > time.monotonic():
+            return
+        self._end_question()
+
+    def _end_question(self):
+        self._cancel_timer()
+        self.status = "REVIEW"
+        self.calculate_scores()
+        # Everyone's rank may have moved, not only the players who answered
+        self._refresh_me = True
+        self.prefetch_next_media()
+
+    def next_media(self) -> Optional[dict]:
+        # {"media", "mediaPath"} of the question that comes next, while there's time to load it
+        if self.status == "WAITING":
+            question = self.quiz.question(0)
+        elif self.status == "REVIEW":
+            question = self.quiz.question(self.current_question_index + 1)
+        else:
+            return None
+        return question.media_hint if question is not None else None
+
+    def prefetch_next_media(self):
+        # Pull the upcoming media into the proxy cache before the clients ask for it
+        hint = self.next_media()
+        if hint is not None and hint["mediaPath"] is not None:
+            spawn(media_cache.warm(hint["media"]))
+
+    def tick_message(self) -> dict:
+        return {
+            "type": "TICK",
+            "timeRemaining": self.time_remaining,
+            "deadline": self.deadline_ms(),
+            "serverTime": server_now_ms(),
+        }
+
+    def calculate_scores(self):
+        question = self.quiz.questions[self.current_question_index]
+        time_limit = question.time_limit
 
-            if is_correct:
-                awarded = 0
-                if self.points_system == "no_points":
-                    awarded = 0
-                elif self.points_system == "simple":
-                    awarded = 1
-                else:
-                    # Standard: base points + speed bonus (up to +50% of base)
-                    base = int(question.get("points") or 0)
-                    time_limit = int(question.get("time_limit") or 0)
-                    bonus = 0
-                    if base > 0 and time_limit > 0:
-                        ratio = max(0.0, min(1.0, ans_time_remaining / float(time_limit)))
-                        bonus = int(round(base * 0.5 * ratio))
-                    awarded = base + bonus
-
-                self.participants[p_id]["score"] += awarded
-                self.last_awards[p_id] = awarded
-            else:
-                self.last_awards[p_id] = 0
+        # Correctness and points for every answer in one pass (vectorized in large rooms)
+        ids = self.participants.ids
+        remaining = self.answers.remaining
+        for slot, correct, awarded in score_columns(question, self.answers, self.points_system):
+            p_id = ids[slot]
+            if correct:
+                self.participants.add_answer_time(slot, round(max(0.0, time_limit - remaining[slot]) * 1000))
+                self.participants.add_points(slot, awarded)
+                self._update_rank(p_id)
+            self.answers.set_award(slot, awarded)
+            self._dirty_participants.add(p_id)
+        self._awards_view = None
+
+    def _update_rank(self, p_id: str):
+        slot = self.participants.slot(p_id)
+        self.leaderboard.update(p_id, self.participants.score(slot), self.participants.answer_ms[slot])
+
+    def _ranked(self, p_ids: List[str], first_rank: int) -> List[dict]:
+        table = self.participants
+        entries = []
+        for rank, p_id in enumerate(p_ids, start=first_rank):
+            slot = table.slot(p_id)
+            entries.append({"rank": rank, "id": p_id, "name": table.name(slot), "color": table.color(slot), "score": table.score(slot)})
+        return entries
+
+    def leaderboard_top(self) -> List[dict]:
+        # Server-ranked top K for the big screen; nothing while a question is running
+        if self.status not in ("REVIEW", "FINISHED"):
+            return []
+        if self.leaderboard_frequency == "end_only" and self.status != "FINISHED":
+            return []
+        size = 3 if self.leaderboard_frequency == "top_3" else LEADERBOARD_SIZE
+        return self._ranked(self.leaderboard.top(size), 1)
 
     def get_state(self):
-        # Prepare safe state for clients
-        connected_ids = set(manager.participant_connections.get(self.session_code, {}).keys())
-        # Count answers only from currently connected participants (host excluded by design)
-        answers_received = sum(1 for pid in self.answers.keys() if pid in connected_ids)
-        current_q = None
-        if self.current_question_index < len(self.quiz['questions']):
-            q = self.quiz['questions'][self.current_question_index]
-            current_q = {
-                "id": str(q['id']),
-                "text": q['text'],
-                "timeLimit": q['time_limit'],
-                "options": [{"id": str(o['id']), "text": o['text']} for o in q['options']], # Don't send is_correct
-                "media": q.get('media_url')
+        # Full (host) view including the roster
+        return self._with_roster(self.view_fields(HOST_VIEW))
+
+    def view_fields(self, view: str) -> dict:
+        # Top-level fields of a view, without the roster or any per-player part
+        fields = self._state_fields()
+        if view == HOST_VIEW:
+            return fields
+        if view == PRESENTER_VIEW:
+            fields.pop("lastAwards")
+            settings = fields["settings"]
+            fields["settings"] = {
+                "pointsSystem": settings["pointsSystem"],
+                "leaderboardFrequency": settings["leaderboardFrequency"],
+                "organizationName": settings["organizationName"],
             }
-            
-            # If in REVIEW or FINISHED, maybe we send correct answers?
-            if self.status in ["REVIEW", "FINISHED"]:
-                 current_q["options"] = [{"id": str(o['id']), "text": o['text'], "isCorrect": o.get('is_correct')} for o in q['options']]
-                 current_q["explanation"] = q.get('explanation')
+            return fields
+        return {
+            "sessionCode": fields["sessionCode"],
+            "status": fields["status"],
+            "currentQuestionIndex": fields["currentQuestionIndex"],
+            "timeRemaining": fields["timeRemaining"],
+            "deadline": fields["deadline"],
+            "currentQuestion": fields["currentQuestion"],
+            "totalQuestions": fields["totalQuestions"],
+            "nextMedia": fields["nextMedia"],
+        }
+
+    def me_state(self, p_id: str) -> Optional[dict]:
+        slot = self.participants.slot(p_id)
+        if slot is None:
+            return None
+        me = {
+            "id": p_id,
+            "name": self.participants.name(slot),
+            "score": self.participants.score(slot),
+            "lastAward": self.answers.award(slot),
+        }
+        if self.status in ("REVIEW", "FINISHED"):
+            # Own rank plus the players just above/below
+            rank = self.leaderboard.rank(p_id)
+            me["rank"] = rank
+            me["totalPlayers"] = len(self.leaderboard)
+            me["around"] = self._ranked(
+                self.leaderboard.around(p_id, LEADERBOARD_AROUND), max(1, rank - LEADERBOARD_AROUND)
+            )
+        return me
+
+    def snapshot_frame(self, view: str, client_id: Optional[str] = None) -> str:
+        channel = self.channels[view]
+        if view == PARTICIPANT_VIEW:
+            frame = channel.snapshot_frame(encode_message)
+            me = self.me_state(client_id) if client_id else None
+            return with_field(frame, "me", encode_message(me)) if me is not None else frame
+        return channel.snapshot_frame(self._encode_with_roster)
+
+    def _with_roster(self, fields: dict) -> dict:
+        state = dict(fields)
+        state["participants"] = self.participants.records()
+        return state
+
+    def _encode_with_roster(self, fields: dict) -> str:
+        # Same JSON as encode_message(self._with_roster(fields)), from the cached roster entries
+        return with_field(encode_message(fields), "participants", self.participants.roster_json())
+
+    def build_fanout(self) -> dict:
+        # One encode per view; phones whose own score/award changed get it appended as "me"
+        dirty = self._dirty_participants
+        # None (no roster key in the patch) unless a player joined, changed or left
+        upsert = [self.participants.encoded(p_id) for p_id in dirty if p_id in self.participants] or None
+        remove = list(self._removed_participants) or None
+        self._dirty_participants = set()
+        self._removed_participants = set()
+        me_ids = dirty
+        if self._refresh_me:
+            me_ids = set(self.participants)
+            self._refresh_me = False
+
+        envelope: dict = {"views": {}}
+        for view in (HOST_VIEW, PRESENTER_VIEW):
+            frame = self.channels[view].patch(self.view_fields(view), upsert, remove)
+            if frame is not None:
+                envelope["views"][view] = frame
+
+        shared = self.channels[PARTICIPANT_VIEW].patch(self.view_fields(PARTICIPANT_VIEW))
+        personal = {}
+        for p_id in me_ids:
+            me = self.me_state(p_id)
+            if me is not None:
+                personal[p_id] = with_field(shared, "me", encode_message(me)) if shared else encode_message(me_message(me))
+        if shared is not None:
+            envelope["participants"] = shared
+        if personal:
+            envelope["personal"] = personal
+        return envelope
+
+    async def broadcast_state(self):
+        # Every state change ends up here, so this is also where it's queued for persistence
+        journal.mark(self)
+        await bus.publish(self.session_code, self.build_fanout())
+
+    async def send_snapshot(self, client_id: str, role: str):
+        await bus.publish(self.session_code, {"direct": [[role, client_id, self.snapshot_frame(role, client_id)]]})
+
+    async def apply_commands(self, commands: List[dict]):
+        # Actor batch: apply everything in order, then publish once
+        self.last_activity = time.monotonic()
+        phase_before = (self.status, self.current_question_index)
+        changed = False
+        for command in commands:
+            try:
+                if await self._apply_command(command):
+                    changed = True
+            except Exception:
+                # One bad command is dropped; the rest of the batch still applies and publishes
+                logger.exception("Game %s: %s command failed", self.session_code, command.get("type"))
+                self.failed_commands += 1
+                changed = True
+        if changed:
+            # A deadline brought forward goes out right away, like a phase change
+            advanced = self._check_auto_advance()
+            # Broadcast what changed (coalesced unless the phase moved)
+            await self.publish(phase_changed=advanced or (self.status, self.current_question_index) != phase_before)
+
+    async def _apply_command(self, command: dict) -> bool:
+        # Apply one command of a batch; True if it may have changed what clients see
+        kind = command.get("type")
+        client_id = command.get("clientId")
+        role = command.get("role")
+        if kind == "SNAPSHOT":
+            await self.send_snapshot(client_id, role)
+            return False
+        if kind == "ACTION":
+            rejected = self.rejected_actions
+            if self.handle_action(client_id, role, command.get("data") or {}, command.get("receivedAt")):
+                return True
+            if self.rejected_actions == rejected:
+                self.dropped_actions += 1
+            return False
+        if kind == "CONNECT":
+            self.client_connected(client_id, role)
+        elif kind == "DISCONNECT":
+            left = self.client_disconnected(client_id, role)
+            # If waiting, remove participant immediately (Clean Lobby)
+            if left and self.status == "WAITING":
+                self.remove_participant(client_id)
+        elif kind == "TIMER_EXPIRED":
+            self.expire_question(command.get("questionIndex"))
+        return True
+
+    def close(self):
+        # The game is being dropped: stop its timer and its command loop
+        self._cancel_timer()
+        self.broadcaster.cancel()
+        self.actor.stop()
+
+    async def publish(self, phase_changed: bool = False):
+        # Phase transitions go out right away; everything else waits for the coalescing window
+        if phase_changed:
+            await self.broadcaster.flush_now()
+        else:
+            self.broadcaster.mark_dirty()
+
+    def _state_fields(self) -> dict:
+        # Prepare safe state for clients (everything except the participant roster)
+        connected_ids = self.connected
+        reviewing = self.status in ("REVIEW", "FINISHED")
+        current_q = None
+        question = self.quiz.question(self.current_question_index)
+        if question is not None:
+            # Pre-rendered at compile time; correct answers only once the question is over
+            current_q = question.payload(reviewing=reviewing)
 
         return {
             "sessionCode": self.session_code,
             "status": self.status,
             "currentQuestionIndex": self.current_question_index,
             "timeRemaining": self.time_remaining,
-            "participants": [{"id": k, **v} for k, v in self.participants.items()],
+            "deadline": self.deadline_ms(),
             "connectedParticipantsCount": len(connected_ids),
-            "answersReceived": answers_received if self.status == "ACTIVE" else 0,
+            # Answers from currently connected participants only (host excluded by design)
+            "answersReceived": self._answered_connected if self.status == "ACTIVE" else 0,
+            # Live per-option counts and response times; correct/incorrect once revealed
+            "answerStats": self.answers.distribution(reveal=reviewing) if self.status != "WAITING" else None,
             "currentQuestion": current_q,
-            "totalQuestions": len(self.quiz['questions']),
+            "totalQuestions": len(self.quiz),
+            # Media of the question coming up, for clients to prefetch (lobby and review only)
+            "nextMedia": self.next_media(),
             "settings": {
                 "pointsSystem": self.points_system,
                 "leaderboardFrequency": self.leaderboard_frequency,
                 "enableTestMode": bool(self.settings.get("enableTestMode", True)),
                 "requirePlayerNames": bool(self.settings.get("requirePlayerNames", True)),
                 "organizationName": self.settings.get("organizationName", "Alteus.ai"),
+                "autoAdvance": self.auto_advance,
             },
-            "lastAwards": self.last_awards if self.status in ["REVIEW", "FINISHED"] else {},
+            "lastAwards": self.last_awards() if reviewing else {},
+            "leaderboard": self.leaderboard_top(),
         }
 
+async def handle_command(session_code: str, command: dict):
+    # Runs on the worker that owns the session (commands arrive through the session bus).
+    # Waits while the game's queue is full, which slows the sender down.
+    game = games.get(session_code)
+    if game is None:
+        return
+    if command.get("type") == "ACTION":
+        # Stamp the receive time before the command waits in the queue (answer timing)
+        command["receivedAt"] = time.monotonic()
+    await game.actor.submit(command)
+
+
+def snapshot_provider(session_code: str, role: str, client_id: str) -> Callable[[], Optional[str]]:
+    # Rendered lazily by the connection's writer. Sessions owned by another worker get a
+    # SNAPSHOT command instead; the frame comes back as a direct fanout.
+    def render() -> Optional[str]:
+        game = games.get(session_code)
+        if game is not None:
+            return game.snapshot_frame(role, client_id)
+        spawn(bus.send_command(session_code, {"type": "SNAPSHOT", "clientId": client_id, "role": role}))
+        return None
+    return render
+
+
+async def _adopt(snapshot: dict) -> bool:
+    code = snapshot["sessionCode"]
+    if code in games or not await reaper.make_room() or not await bus.claim(code):
+        return False
+    game = ActiveGame.from_snapshot(snapshot)
+    games[code] = game
+    game.resume()
+    return True
+
+
+async def restore_games():
+    # Bring back games that were running when the process stopped. With several workers each
+    # game is restored by whichever worker claims it first.
+    for snapshot in await journal.load_unfinished(server_now_ms()):
+        await _adopt(snapshot)
+
+
+async def restore_game(session_code: str) -> bool:
+    # Reload one unfinished game on demand (e.g. evicted while idle, then someone reconnects)
+    snapshot = await journal.load(session_code)
+    return snapshot is not None and await _adopt(snapshot)
+
+
+async def evict_game(session_code: str, reason: str, persist: bool = True):
+    # Drop a game from memory. Its sockets on every worker are closed; an unfinished game's
+    # state is saved first so it can be reloaded if someone comes back.
+    game = games.pop(session_code, None)
+    if game is None:
+        return
+    game.close()
+    if persist:
+        journal.mark(game)
+        await journal.flush()
+    else:
+        journal.forget(session_code)
+    await bus.publish(session_code, {"close": reason})
+    await bus.release(session_code)
+
+
+async def drop_lost_game(session_code: str):
+    # Ownership lapsed and another worker may have restored the game: stop this copy without
+    # saving it (that would overwrite the new owner's state) and close its sockets here, so
+    # their clients reconnect and get the new owner's state
+    game = games.pop(session_code, None)
+    if game is not None:
+        game.close()
+        journal.forget(session_code)
+    manager.close_session(session_code, "Session moved to another worker", SESSION_MOVED_CODE)
+
+
 # Global Managers
 manager = ConnectionManager()
+# Sessions owned by this worker
 games: Dict[str, ActiveGame] = {}
+bus = create_session_bus()
+bus.set_handlers(handle_command, manager.deliver, drop_lost_game)
+journal = GameJournal()
+# Question deadlines of every game owned by this worker
+timers = TimerScheduler()
+# TTL/LRU eviction of finished and abandoned games
+reaper = SessionReaper(games, evict_game)
+# Question media proxied through an on-disk cache (GET /media/questions/{id})
+media_cache = MediaCache()
 
@@ -0,0 +1,152 @@
+import random
+from typing import Dict, List, Optional, Tuple
+
+# Entries are ordered by this key: highest score first, then the least total time spent on
+# correct answers, then participant id so the order is fully deterministic.
+Key = Tuple[int, int, str]
+
+
+class _Node:
+    __slots__ = ("key", "priority", "size", "left", "right")
+
+    def __init__(self, key: Key):
+        self.key = key
+        self.priority = random.random()
+        self.size = 1
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+
+def _update(node: _Node) -> _Node:
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return node
+
+
+def _split(node: Optional[_Node], key: Key) -> Tuple[Optional[_Node], Optional[_Node]]:
+    # (keys < key, keys >= key)
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        return _update(node), right
+    left, node.left = _split(node.left, key)
+    return left, _update(node)
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    # Every key in `left` is smaller than every key in `right`
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+
+class Leaderboard:
+    """
+    Ranking of a game's participants, kept up to date as scores change.
+
+    Backed by a treap (randomized balanced search tree) whose nodes know their subtree size,
+    so updating a score, the rank of a player, the top K and the players around someone are
+    all O(log n) (plus the size of the returned slice) instead of a sort per render.
+    Ranks are 1-based.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._keys: Dict[str, Key] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, p_id: str) -> bool:
+        return p_id in self._keys
+
+    def update(self, p_id: str, score: int, answer_time_ms: int = 0):
+        key = (-int(score), int(answer_time_ms), p_id)
+        if self._keys.get(p_id) == key:
+            return
+        self.remove(p_id)
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _Node(key)), right)
+        self._keys[p_id] = key
+
+    def remove(self, p_id: str):
+        key = self._keys.pop(p_id, None)
+        if key is None:
+            return
+        left, rest = _split(self._root, key)
+        # `rest` starts with `key` itself; drop that one node
+        _, right = _split(rest, (key[0], key[1], key[2] + "\0"))
+        self._root = _merge(left, right)
+
+    def clear(self):
+        self._root = None
+        self._keys = {}
+
+    def rank(self, p_id: str) -> Optional[int]:
+        key = self._keys.get(p_id)
+        if key is None:
+            return None
+        # 1 + number of keys smaller than `key`
+        below = 0
+        node = self._root
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                below += _size(node.left) + 1
+                node = node.right
+            else:
+                below += _size(node.left)
+                break
+        return below + 1
+
+    def slice(self, start: int, stop: int) -> List[str]:
+        # Participant ids ranked start+1 .. stop (0-based, half-open like list slicing)
+        start = max(0, start)
+        stop = min(len(self._keys), stop)
+        out: List[str] = []
+        if start >= stop:
+            return out
+        # In-order walk that skips whole subtrees before `start`
+        stack: List[_Node] = []
+        node = self._root
+        index = start
+        while node is not None:
+            left_size = _size(node.left)
+            if index < left_size:
+                stack.append(node)
+                node = node.left
+            elif index == left_size:
+                stack.append(node)
+                break
+            else:
+                index -= left_size + 1
+                node = node.right
+        while stack and len(out) < stop - start:
+            node = stack.pop()
+            out.append(node.key[2])
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+        return out
+
+    def top(self, k: int) -> List[str]:
+        return self.slice(0, k)
+
+    def around(self, p_id: str, radius: int) -> List[str]:
+        # Up to `radius` players on each side of `p_id`, including `p_id`
+        rank = self.rank(p_id)
+        if rank is None:
+            return []
+        return self.slice(rank - 1 - radius, rank + radius)
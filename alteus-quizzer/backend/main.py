@@ -1,13 +1,13 @@
-from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
-from typing import List
+from typing import List, Optional
 from contextlib import asynccontextmanager
 from sqlalchemy.orm import selectinload
 import random
 import string
-import json
 import os
 
 from database import init_db, get_session
@@ -15,16 +15,20 @@ from models import (
     Quiz,
     QuizCreate,
     QuizRead,
+    QuizUpdate,
+    QuizUpdateRead,
     Question,
-    AnswerOption,
     Session,
     SessionRead,
-    SessionBase,
     AppSettings,
     AppSettingsRead,
     AppSettingsUpdate,
 )
-from game_manager import manager, games, ActiveGame
+from game_manager import manager, games, bus, journal, timers, reaper, media_cache, evict_game, restore_game, restore_games, ActiveGame, client_role, server_now_ms, snapshot_provider
+from quiz_runtime import compile_quiz
+from quiz_store import insert_questions, load_quiz, update_quiz_rows
+from media_proxy import MEDIA_MAX_AGE_SECONDS, MediaUnavailableError, MediaUrlCache, media_path
+from wire import encode_message, negotiate_subprotocol
 from ai_routes import router as ai_router
 
 # --- Text constraints (keep in sync with frontend + specs) ---
@@ -65,7 +69,15 @@ def _sanitize_quiz_payload(quiz: QuizCreate) -> QuizCreate:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await bus.start()
+    # Resume games that were in progress before a restart, then keep saving them behind the scenes
+    await restore_games()
+    await journal.start()
+    await reaper.start()
     yield
+    await reaper.stop()
+    await journal.stop()
+    await bus.stop()
 
 app = FastAPI(title="Alteus Quizzer API", lifespan=lifespan)
 
@@ -154,113 +166,32 @@ async def create_quiz(quiz: QuizCreate, db: AsyncSession = Depends(get_session))
         default_time_limit=quiz.default_time_limit
     )
     db.add(db_quiz)
+    # Flush (not commit) for the id: quiz, questions and options go in one transaction
+    await db.flush()
+    await insert_questions(db, db_quiz.id, quiz.questions)
     await db.commit()
-    await db.refresh(db_quiz)
-    
-    for q_data in quiz.questions:
-        db_question = Question(
-            quiz_id=db_quiz.id,
-            text=q_data.text,
-            time_limit=q_data.time_limit,
-            points=q_data.points,
-            order=q_data.order,
-            explanation=q_data.explanation,
-            media_url=q_data.media_url,
-            question_type=q_data.question_type
-        )
-        db.add(db_question)
-        await db.commit()
-        await db.refresh(db_question)
-        
-        for opt_data in q_data.options:
-            db_option = AnswerOption(
-                question_id=db_question.id,
-                text=opt_data.text,
-                is_correct=opt_data.is_correct,
-                order=opt_data.order
-            )
-            db.add(db_option)
-    
-    await db.commit()
-    
+
     # Reload with relationships
-    stmt = select(Quiz).where(Quiz.id == db_quiz.id).options(
-        selectinload(Quiz.questions).selectinload(Question.options)
-    )
-    result = await db.exec(stmt)
-    return result.one()
+    return await load_quiz(db, db_quiz.id)
 
-@app.put("/quizzes/{quiz_id}", response_model=QuizRead)
-async def update_quiz(quiz_id: int, quiz_data: QuizCreate, db: AsyncSession = Depends(get_session)):
+@app.put("/quizzes/{quiz_id}", response_model=QuizUpdateRead)
+async def update_quiz(quiz_id: int, quiz_data: QuizUpdate, db: AsyncSession = Depends(get_session)):
     quiz_data = _sanitize_quiz_payload(quiz_data)
     # Fetch existing quiz
-    stmt = select(Quiz).where(Quiz.id == quiz_id).options(
-        selectinload(Quiz.questions).selectinload(Question.options)
-    )
-    result = await db.exec(stmt)
-    db_quiz = result.one_or_none()
+    db_quiz = await load_quiz(db, quiz_id)
     
     if not db_quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
-    # Update basic fields
-    db_quiz.title = quiz_data.title
-    db_quiz.goal = getattr(quiz_data, "goal", None)
-    db_quiz.description = quiz_data.description
-    db_quiz.default_time_limit = quiz_data.default_time_limit
-    
-    # Update questions: Simplest approach is delete all and recreate
-    # Note: In a real prod app, you might want to diff/update to preserve stats/ids if needed
-    
-    # Remove existing questions (cascade should handle options)
-    # However, selectinload doesn't always play nice with direct list manipulation for deletion in some async contexts
-    # Let's try clearing the list
-    for q in db_quiz.questions:
-        await db.delete(q) # Explicitly delete
-        
-    db_quiz.questions = []
-    
-    # Add new questions
-    for q_data in quiz_data.questions:
-        db_question = Question(
-            quiz_id=db_quiz.id,
-            text=q_data.text,
-            time_limit=q_data.time_limit,
-            points=q_data.points,
-            order=q_data.order,
-            explanation=q_data.explanation,
-            media_url=q_data.media_url,
-            question_type=q_data.question_type
-        )
-        db.add(db_question)
-        # Need to commit/flush to get ID? Or just add to session
-        # We can add to DB session directly
-        
-        # We can't add options immediately if we don't have question ID yet?
-        # SQLModel/SQLAlchemy can handle this via relationships if constructed carefully
-        # But let's do step-by-step for safety
-        
-        await db.commit() 
-        await db.refresh(db_question)
-
-        for opt_data in q_data.options:
-            db_option = AnswerOption(
-                question_id=db_question.id,
-                text=opt_data.text,
-                is_correct=opt_data.is_correct,
-                order=opt_data.order
-            )
-            db.add(db_option)
-            
+    # Only rows that changed are written (question/option ids are kept), in one transaction
+    question_ids = [q.id for q in db_quiz.questions]
+    changes = await update_quiz_rows(db, db_quiz, quiz_data)
     await db.commit()
-    await db.refresh(db_quiz)
+    media_urls.forget(question_ids)
 
     # Reload with relationships
-    stmt = select(Quiz).where(Quiz.id == db_quiz.id).options(
-        selectinload(Quiz.questions).selectinload(Question.options)
-    )
-    result = await db.exec(stmt)
-    return result.one()
+    db_quiz = await load_quiz(db, quiz_id)
+    return QuizUpdateRead.model_validate(db_quiz, update={"changes": changes})
 
 
 @app.get("/quizzes/", response_model=List[QuizRead])
@@ -301,20 +232,95 @@ async def delete_quiz(quiz_id: int, db: AsyncSession = Depends(get_session)):
     for s in list(getattr(quiz, "sessions", []) or []):
         code = getattr(s, "code", None)
         if code:
-            games.pop(code, None)
-            manager.active_connections.pop(code, None)
-            manager.participant_connections.pop(code, None)
-            manager.host_connections.pop(code, None)
+            await evict_game(code, "Quiz deleted", persist=False)
+            manager.drop_session(code)
 
+    question_ids = [q.id for q in quiz.questions]
     await db.delete(quiz)
     await db.commit()
+    media_urls.forget(question_ids)
     return {"ok": True}
 
 # --- Session Management ---
 
+@app.get("/sessions/{session_code}/stats")
+async def read_session_stats(session_code: str):
+    # Outbound queue health for a live session (queue depth, dropped frames, slow clients)
+    if session_code not in games:
+        raise HTTPException(status_code=404, detail="Session not found")
+    stats = manager.session_stats(session_code)
+    # Command throughput of the game's single writer
+    stats["actor"] = games[session_code].actor.stats()
+    # State changes requested vs. broadcasts sent after coalescing
+    stats["broadcast"] = games[session_code].broadcaster.stats()
+    # Valid but no-op actions, invalid ones, and commands that raised
+    stats["droppedActions"] = games[session_code].dropped_actions
+    stats["rejectedActions"] = games[session_code].rejected_actions
+    stats["failedCommands"] = games[session_code].failed_commands
+    return stats
+
+@app.get("/sessions/{session_code}/answers")
+async def read_answer_timings(session_code: str):
+    # Per-answer timing of the current question (server receive time, client-reported latency)
+    if session_code not in games:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return games[session_code].answer_timings()
+
+@app.get("/admin/sessions")
+async def list_live_sessions():
+    # Live games held by this worker with their estimated memory footprint, largest first,
+    # plus the write-behind journal that saves them
+    return {**reaper.describe(), "journal": journal.stats()}
+
+@app.get("/timers")
+async def read_timer_stats():
+    # Shared question-timer scheduler of this worker (pending deadlines, lateness)
+    return timers.stats()
+
+# --- Media ---
+
+# Question id -> media URL, so media requests only go to the database on a miss
+media_urls = MediaUrlCache()
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+@app.get("/media/questions/{question_id}")
+async def read_question_media(question_id: int, request: Request, w: Optional[int] = None, db: AsyncSession = Depends(get_session)):
+    # A question's media through the on-disk cache; `w` asks for a narrower variant (phones).
+    # Range requests are answered by FileResponse; a matching If-None-Match gets a 304.
+    media_url = media_urls.get(question_id)
+    if media_url is None:
+        question = await db.get(Question, question_id)
+        if question is None or media_path(question.id, question.media_url) is None:
+            raise HTTPException(status_code=404, detail="Media not found")
+        media_url = question.media_url
+        media_urls.put(question_id, media_url)
+    try:
+        path, meta = await media_cache.get(media_url, w)
+    except MediaUnavailableError:
+        # The cache logs the reason; clients only learn that the media can't be served
+        raise HTTPException(status_code=502, detail="Media unavailable")
+    headers = {"ETag": meta["etag"], "Cache-Control": f"public, max-age={MEDIA_MAX_AGE_SECONDS}"}
+    if _etag_matches(request.headers.get("if-none-match"), meta["etag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=meta["contentType"], headers=headers)
+
+@app.get("/media/stats")
+async def read_media_stats():
+    # Media proxy cache of this worker (hits, upstream fetches, variants rendered, errors),
+    # plus the question id -> URL lookups that skipped the database
+    return {**media_cache.stats(), "urlHits": media_urls.hits, "urlMisses": media_urls.misses}
+
 def generate_code():
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
 
+# Fresh codes tried before giving up on creating a session
+CODE_ATTEMPTS = 10
+
 @app.post("/sessions/", response_model=SessionRead)
 async def create_session(quiz_id: int, session_db: AsyncSession = Depends(get_session)):
     # Load quiz with all data
@@ -326,19 +332,34 @@ async def create_session(quiz_id: int, session_db: AsyncSession = Depends(get_se
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
+    # Respect MAX_LIVE_SESSIONS (evicts the least recently used idle game if needed)
+    if not await reaper.make_room():
+        raise HTTPException(status_code=503, detail="Too many live sessions, try again later")
+
     settings = await _get_or_create_settings(session_db)
 
+    # Claim the code before anything is stored: a code that is live here or owned by another
+    # worker is skipped, so this worker only ever creates games it owns
+    for _ in range(CODE_ATTEMPTS):
+        code = generate_code()
+        if code not in games and await bus.claim(code):
+            break
+    else:
+        raise HTTPException(status_code=503, detail="Could not allocate a session code, try again")
+
     # Create Session in DB
-    code = generate_code()
-    # Ensure uniqueness loop (simplified)
     db_session = Session(quiz_id=quiz.id, code=code, status="WAITING")
     session_db.add(db_session)
-    await session_db.commit()
+    try:
+        await session_db.commit()
+    except Exception:
+        await bus.release(code)
+        raise
     await session_db.refresh(db_session)
 
     # Initialize Active Game in Memory
-    # Convert SQLModel to dict structure expected by ActiveGame
-    # We need to manually construct the dict to ensure nested lists are correct
+    # Convert SQLModel to the plain dict form, then compile it once into the game's runtime
+    # structure (option lookups, correct sets, pre-rendered question payloads)
     quiz_data = {
         "title": quiz.title,
         "questions": [
@@ -355,7 +376,7 @@ async def create_session(quiz_id: int, session_db: AsyncSession = Depends(get_se
     }
     
     games[code] = ActiveGame(
-        quiz_data,
+        compile_quiz(quiz_data),
         code,
         settings={
             "defaultTimerSeconds": settings.default_timer_seconds,
@@ -364,8 +385,13 @@ async def create_session(quiz_id: int, session_db: AsyncSession = Depends(get_se
             "enableTestMode": settings.enable_test_mode,
             "requirePlayerNames": settings.require_player_names,
             "organizationName": settings.organization_name,
+            "autoAdvance": settings.auto_advance,
+            "autoAdvanceGraceSeconds": settings.auto_advance_grace_seconds,
         },
     )
+    journal.mark(games[code])
+    # The first question's media, ready before the host starts
+    games[code].prefetch_next_media()
     
     # Manually attach the fully loaded quiz to the session object
     # This prevents the MissingGreenlet error when Pydantic tries to access the lazy relationship
@@ -375,55 +401,54 @@ async def create_session(quiz_id: int, session_db: AsyncSession = Depends(get_se
 
 @app.websocket("/ws/{session_code}/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, session_code: str, client_id: str):
-    is_host = client_id == "host"
+    role = client_role(client_id)
     
-    if session_code not in games:
-        await websocket.close(code=4000, reason="Session not found")
-        return
-
-    game = games[session_code]
-    await manager.connect(websocket, session_code, client_id, is_host)
+    # Any worker accepts the socket; the session's owner (possibly another worker) runs the game.
+    # A game evicted while idle is reloaded from its last saved state.
+    if session_code not in games and await bus.owner(session_code) is None:
+        if not await restore_game(session_code):
+            await websocket.close(code=4000, reason="Session not found")
+            return
+
+    connection = await manager.connect(
+        websocket,
+        session_code,
+        client_id,
+        role,
+        snapshot=snapshot_provider(session_code, role, client_id),
+        # Binary (MessagePack) frames for clients that offer it; JSON for everyone else
+        subprotocol=negotiate_subprotocol(websocket.scope.get("subprotocols") or []),
+    )
+    await bus.send_command(session_code, {"type": "CONNECT", "clientId": client_id, "role": role})
     
     try:
         # Send initial state
-        await websocket.send_json({"type": "STATE_UPDATE", "state": game.get_state()})
+        connection.request_snapshot()
         
         while True:
-            data = await websocket.receive_json()
+            data = await connection.receive()
             # Process actions
-            action = data.get("action")
-            
-            if is_host:
-                if action == "START_GAME":
-                    game.start_game()
-                elif action == "NEXT_QUESTION":
-                    game.next_question()
-                elif action == "SKIP_TIMER":
-                    game.skip_timer()
-                elif action == "RESET":
-                    game.reset_game()
-                    # Prune disconnected players
-                    active_ids = list(manager.participant_connections.get(session_code, {}).keys())
-                    game.prune_participants(active_ids)
-            else:
-                if action == "JOIN":
-                    name = data.get("name", "Anonymous")
-                    color = data.get("color", "#000000")
-                    game.add_participant(client_id, name, color)
-                elif action == "SUBMIT_ANSWER":
-                    answer_id = data.get("answerId")
-                    game.submit_answer(client_id, answer_id)
+            action = data.get("action") if isinstance(data, dict) else None
+            # Floods and junk stop here, before they reach the game (or the session bus)
+            if not connection.accept_action(action):
+                continue
+
+            if action == "RESYNC":
+                # Client saw a gap in patch seqs; send it a fresh snapshot only
+                connection.request_snapshot()
+                continue
+
+            if action == "CLOCK_SYNC":
+                # Clock-offset handshake: echo the client's send time next to our clock
+                connection.enqueue(encode_message({"type": "CLOCK_SYNC", "t0": data.get("t0"), "serverTime": server_now_ms()}))
+                continue
             
-            # Broadcast update
-            await manager.broadcast(session_code, {"type": "STATE_UPDATE", "state": game.get_state()})
+            # Game state only changes on the owning worker
+            await bus.send_command(session_code, {"type": "ACTION", "clientId": client_id, "role": role, "data": data})
             
     except WebSocketDisconnect:
-        manager.disconnect(websocket, session_code, client_id, is_host)
-        
-        # If waiting, remove participant immediately (Clean Lobby)
-        if session_code in games and not is_host:
-            game = games[session_code]
-            if game.status == "WAITING":
-                game.remove_participant(client_id)
-                await manager.broadcast(session_code, {"type": "STATE_UPDATE", "state": game.get_state()})
-
+        pass
+    finally:
+        # Whatever ended the loop, the client is gone: free its slot in the registry and the game
+        manager.disconnect(connection)
+        await bus.send_command(session_code, {"type": "DISCONNECT", "clientId": client_id, "role": role})
@@ -0,0 +1,320 @@
+import asyncio
+import hashlib
+import ipaddress
+import json
+import logging
+import os
+import socket
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Where fetched media and their size variants are kept (shared by the workers of one node)
+MEDIA_CACHE_DIR = os.getenv(
+    "MEDIA_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "media_cache")
+)
+# Least recently used files are deleted once the cache grows past this size
+MEDIA_CACHE_MAX_MB = int(os.getenv("MEDIA_CACHE_MAX_MB", "512"))
+# Upstream files larger than this are not proxied
+MEDIA_MAX_MB = int(os.getenv("MEDIA_MAX_MB", "20"))
+MEDIA_FETCH_TIMEOUT_SECONDS = float(os.getenv("MEDIA_FETCH_TIMEOUT_SECONDS", "15"))
+# Widths a size variant may be requested at; other widths are rounded up to one of these
+MEDIA_THUMB_WIDTHS = sorted(int(w) for w in os.getenv("MEDIA_THUMB_WIDTHS", "480,960").split(",") if w.strip())
+# Browsers may reuse a proxied file this long without revalidating
+MEDIA_MAX_AGE_SECONDS = int(os.getenv("MEDIA_MAX_AGE_SECONDS", "86400"))
+# Upstream redirects followed per fetch (each hop is checked like the original URL)
+MEDIA_MAX_REDIRECTS = int(os.getenv("MEDIA_MAX_REDIRECTS", "5"))
+# Question id -> media URL lookups kept per worker, and how long one is trusted before the
+# database is asked again (edits made through another worker show up after this)
+MEDIA_URL_CACHE_SIZE = int(os.getenv("MEDIA_URL_CACHE_SIZE", "4096"))
+MEDIA_URL_CACHE_SECONDS = float(os.getenv("MEDIA_URL_CACHE_SECONDS", "60"))
+
+# Upstream content types worth proxying, and the ones Pillow re-encodes into variants
+PROXIED_TYPES = ("image/", "video/", "audio/")
+RESIZABLE_TYPES = {"image/jpeg": "JPEG", "image/png": "PNG", "image/webp": "WEBP"}
+
+
+class MediaUnavailableError(RuntimeError):
+    pass
+
+
+def media_path(question_id, media_url: Optional[str]) -> Optional[str]:
+    # Proxied path of a question's media (only http(s) media is proxied)
+    if not media_url or not media_url.startswith(("http://", "https://")):
+        return None
+    return f"/media/questions/{question_id}"
+
+
+async def check_public_url(url: str):
+    """
+    Refuse URLs the proxy must not fetch: non-http(s) schemes and hosts that resolve to
+    loopback, private, link-local (cloud metadata), multicast or reserved addresses.
+
+    Media URLs come from the quiz API, so without this anyone could make the server request
+    its own internal network.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError as e:
+        raise MediaUnavailableError("Malformed URL") from e
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise MediaUnavailableError("Not an http(s) URL")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname, port or (443 if parts.scheme == "https" else 80), type=socket.SOCK_STREAM
+        )
+    except (OSError, UnicodeError) as e:
+        raise MediaUnavailableError(f"Cannot resolve {parts.hostname}") from e
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global or address.is_multicast:
+            raise MediaUnavailableError(f"{parts.hostname} is not a public address")
+
+
+def variant_width(width: Optional[int]) -> Optional[int]:
+    # Smallest allowed width that is at least `width` (None = the original)
+    if not width or width <= 0:
+        return None
+    for allowed in MEDIA_THUMB_WIDTHS:
+        if allowed >= width:
+            return allowed
+    return None
+
+
+class MediaUrlCache:
+    """
+    Media URLs of recently requested questions, so a room loading a question's image doesn't
+    cost one database lookup per phone. Least recently used entries go first; quiz edits on
+    this worker forget their questions right away.
+    """
+
+    def __init__(self, size: int = MEDIA_URL_CACHE_SIZE, ttl: float = MEDIA_URL_CACHE_SECONDS):
+        self.size = size
+        self.ttl = ttl
+        # question id -> (monotonic expiry, media URL)
+        self._entries: "OrderedDict[int, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, question_id: int) -> Optional[str]:
+        entry = self._entries.get(question_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(question_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(question_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, question_id: int, url: str):
+        if self.size <= 0:
+            return
+        self._entries[question_id] = (time.monotonic() + self.ttl, url)
+        self._entries.move_to_end(question_id)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def forget(self, question_ids):
+        for question_id in question_ids:
+            self._entries.pop(question_id, None)
+
+
+class MediaCache:
+    """
+    On-disk cache of quiz media, fetched from the upstream host once per URL.
+
+    Files are stored under a hash of their URL (`<key>.bin` plus `<key>.json` holding the
+    content type and ETag); size variants sit next to them as `<key>-w<width>.bin`. Concurrent
+    requests for a file that isn't cached yet wait for one upstream fetch, so a room opening a
+    question at once costs the image host a single request. The ETag is a hash of the content,
+    so it is the same on every worker and survives restarts. Files are written to a temporary
+    name and renamed into place, which keeps several workers sharing the directory safe.
+    """
+
+    def __init__(self, root: str = MEDIA_CACHE_DIR, max_bytes: int = MEDIA_CACHE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        # key -> pending fetch/resize, shared by the requests waiting on it
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Originals being rendered into variants (name -> renders), which _trim must leave alone
+        self._reading: Dict[str, int] = {}
+        self.hits = 0
+        self.fetches = 0
+        self.variants = 0
+        self.errors = 0
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    async def get(self, url: str, width: Optional[int] = None) -> Tuple[str, dict]:
+        # (path on disk, {"contentType", "etag"}) of the file, or of its variant at `width`
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        path, meta = await self._once(key, lambda: self._fetch(key, url))
+        width = variant_width(width)
+        if width is None or meta["contentType"] not in RESIZABLE_TYPES:
+            return path, meta
+        return await self._once(f"{key}-w{width}", lambda: self._resize(key, path, meta, width))
+
+    async def warm(self, url: str):
+        # Fetch a file (and its variants) ahead of the clients; failures are left for them to see
+        try:
+            for width in [None] + MEDIA_THUMB_WIDTHS:
+                await self.get(url, width)
+        except MediaUnavailableError:
+            # Already logged by the fetch
+            pass
+        except Exception:
+            # Runs as a fire-and-forget task, so nothing may escape it
+            logger.exception("Media prefetch of %s failed", url)
+
+    async def _once(self, name: str, produce) -> Tuple[str, dict]:
+        cached = self._read_meta(name)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        pending = self._pending.get(name)
+        if pending is None:
+            pending = self._pending[name] = asyncio.ensure_future(produce())
+            pending.add_done_callback(lambda _: self._pending.pop(name, None))
+        # Shielded: one waiter giving up (client gone) doesn't cancel the fetch for the others
+        return await asyncio.shield(pending)
+
+    def _read_meta(self, name: str) -> Optional[Tuple[str, dict]]:
+        path = self._file(name + ".bin")
+        try:
+            with open(self._file(name + ".json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            # Recently used files are the last to be trimmed
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return path, meta
+
+    def _write(self, name: str, body: bytes, meta: dict) -> Tuple[str, dict]:
+        os.makedirs(self.root, exist_ok=True)
+        path = self._file(name + ".bin")
+        for target, data in ((path, body), (self._file(name + ".json"), json.dumps(meta).encode("utf-8"))):
+            tmp = f"{target}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+        self._trim()
+        return path, meta
+
+    async def _fetch(self, key: str, url: str) -> Tuple[str, dict]:
+        self.fetches += 1
+        limit = MEDIA_MAX_MB * 1024 * 1024
+        digest = hashlib.sha256()
+        chunks: List[bytes] = []
+        size = 0
+        try:
+            async with httpx.AsyncClient(timeout=httpx.Timeout(MEDIA_FETCH_TIMEOUT_SECONDS)) as client:
+                # Redirects are followed by hand so every hop gets the same address check
+                for _ in range(MEDIA_MAX_REDIRECTS + 1):
+                    await check_public_url(url)
+                    async with client.stream("GET", url) as resp:
+                        if resp.is_redirect:
+                            url = urljoin(url, resp.headers["location"])
+                            continue
+                        if resp.status_code >= 400:
+                            raise MediaUnavailableError(f"Upstream returned {resp.status_code}")
+                        content_type = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+                        if not content_type.startswith(PROXIED_TYPES):
+                            raise MediaUnavailableError(f"Not a media file ({content_type or 'no content type'})")
+                        async for chunk in resp.aiter_bytes():
+                            size += len(chunk)
+                            if size > limit:
+                                raise MediaUnavailableError(f"Larger than {MEDIA_MAX_MB} MB")
+                            digest.update(chunk)
+                            chunks.append(chunk)
+                        break
+                else:
+                    raise MediaUnavailableError("Too many redirects")
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
+            self.errors += 1
+            logger.info("Media fetch of %s failed: %s", url, e)
+            raise MediaUnavailableError(f"Upstream fetch failed: {e}") from e
+        except MediaUnavailableError as e:
+            self.errors += 1
+            logger.info("Media fetch of %s refused: %s", url, e)
+            raise
+        meta = {"contentType": content_type, "etag": f'"{digest.hexdigest()[:32]}"'}
+        return await asyncio.to_thread(self._write, key, b"".join(chunks), meta)
+
+    async def _resize(self, key: str, path: str, meta: dict, width: int) -> Tuple[str, dict]:
+        self.variants += 1
+        name = f"{key}-w{width}"
+        fmt = RESIZABLE_TYPES[meta["contentType"]]
+
+        def render() -> Tuple[str, dict]:
+            with Image.open(path) as img:
+                if img.width <= width:
+                    # Already small enough: the variant is a copy of the original
+                    with open(path, "rb") as f:
+                        return self._write(name, f.read(), meta)
+                height = max(1, round(img.height * width / img.width))
+                resized = img.resize((width, height), Image.LANCZOS)
+                if fmt == "JPEG" and resized.mode not in ("RGB", "L"):
+                    resized = resized.convert("RGB")
+                tmp = self._file(f"{name}.{os.getpid()}.img")
+                resized.save(tmp, format=fmt, quality=80, optimize=True)
+            with open(tmp, "rb") as f:
+                body = f.read()
+            os.remove(tmp)
+            return self._write(name, body, {"contentType": meta["contentType"], "etag": meta["etag"][:-1] + f'-w{width}"'})
+
+        self._reading[key] = self._reading.get(key, 0) + 1
+        try:
+            return await asyncio.to_thread(render)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # Unreadable by Pillow, or too many pixels to decode safely: serve the original
+            self.errors += 1
+            return path, meta
+        finally:
+            self._reading[key] -= 1
+            if not self._reading[key]:
+                del self._reading[key]
+
+    def _trim(self):
+        # Delete the least recently used files until the cache is back under 90% of its cap
+        files = []
+        try:
+            for entry in os.scandir(self.root):
+                if entry.name.endswith(".bin"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.name[: -len(".bin")]))
+        except OSError:
+            return
+        # Copied in one step: this runs in a worker thread while the loop updates the dict
+        reading = set(self._reading)
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes * 0.9:
+                break
+            if name in reading:
+                continue
+            for suffix in (".json", ".bin"):
+                try:
+                    os.remove(self._file(name + suffix))
+                except OSError:
+                    pass
+            total -= size
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "variants": self.variants,
+            "errors": self.errors,
+            "pending": len(self._pending),
+        }
@@ -13,6 +13,9 @@ class AppSettingsBase(SQLModel):
     enable_test_mode: bool = True
     require_player_names: bool = True
     organization_name: str = "Alteus.ai"
+    # End a question early once every connected player answered, after this many seconds
+    auto_advance: bool = False
+    auto_advance_grace_seconds: int = 2
     # Optional Alteus provider overrides (if null/empty => fallback to .env defaults)
     alteus_api_url: Optional[str] = Field(default=None, sa_column=Column(Text))
     alteus_api_key: Optional[str] = Field(default=None, sa_column=Column(Text))
@@ -61,14 +64,21 @@ class AppSettings(AppSettingsBase, table=True):
 
 class Quiz(QuizBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    questions: List["Question"] = Relationship(back_populates="quiz", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
+    # Authored order; the id only breaks ties (rows keep their ids when a quiz is edited)
+    questions: List["Question"] = Relationship(
+        back_populates="quiz",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan", "order_by": "[Question.order, Question.id]"},
+    )
     sessions: List["Session"] = Relationship(back_populates="quiz", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
 
 class Question(QuestionBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     quiz_id: Optional[int] = Field(default=None, foreign_key="quiz.id")
     quiz: Optional[Quiz] = Relationship(back_populates="questions")
-    options: List["AnswerOption"] = Relationship(back_populates="question", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
+    options: List["AnswerOption"] = Relationship(
+        back_populates="question",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan", "order_by": "[AnswerOption.order, AnswerOption.id]"},
+    )
 
 class AnswerOption(AnswerOptionBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -79,12 +89,16 @@ class Session(SessionBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     quiz_id: Optional[int] = Field(default=None, foreign_key="quiz.id")
     quiz: Optional[Quiz] = Relationship(back_populates="sessions")
+    # Serialized ActiveGame, written behind the live game so it can be restored after a restart
+    live_state: Optional[str] = Field(default=None, sa_column=Column(Text))
     participants: List["Participant"] = Relationship(back_populates="session", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
 
 class Participant(ParticipantBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     session_id: Optional[int] = Field(default=None, foreign_key="session.id")
     session: Optional[Session] = Relationship(back_populates="participants")
+    # WebSocket client id the player joined with
+    client_id: Optional[str] = Field(default=None, index=True)
 
 # --- Schemas for API ---
 
@@ -108,6 +122,28 @@ class QuizRead(QuizBase):
     id: int
     questions: List[QuestionRead]
 
+# Quiz updates are applied as a diff: rows sent with their id are updated in place (if changed),
+# rows without one are matched to stored ones or inserted, stored rows left over are deleted.
+class AnswerOptionUpdate(AnswerOptionCreate):
+    id: Optional[int] = None
+
+class QuestionUpdate(QuestionCreate):
+    id: Optional[int] = None
+    options: List[AnswerOptionUpdate]
+
+class QuizUpdate(QuizCreate):
+    questions: List[QuestionUpdate]
+
+class QuizRowChanges(SQLModel):
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+class QuizUpdateRead(QuizRead):
+    # Rows (quiz, questions, options) the update wrote
+    changes: QuizRowChanges
+
 class SessionRead(SessionBase):
     id: int
     quiz: QuizRead
@@ -124,6 +160,8 @@ class AppSettingsUpdate(SQLModel):
     enable_test_mode: Optional[bool] = None
     require_player_names: Optional[bool] = None
     organization_name: Optional[str] = None
+    auto_advance: Optional[bool] = None
+    auto_advance_grace_seconds: Optional[int] = None
     alteus_api_url: Optional[str] = None
     alteus_api_key: Optional[str] = None
     alteus_endpoint_id: Optional[str] = None
@@ -0,0 +1,142 @@
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+from wire import encode_message
+
+
+class ParticipantTable:
+    """
+    Roster of one game, stored column-wise by a dense player number ("slot").
+
+    Ids, names, color indexes (into a per-game palette, so the handful of distinct colors is
+    stored once), scores and total answer times (leaderboard tie-break) live in parallel
+    columns instead of one dict per player. Slots of
+    players who left are reused. Each player's roster entry is encoded to JSON once per change
+    and kept, so snapshots and patches splice cached fragments instead of rebuilding
+    `{"id": ..., **player}` dicts on every broadcast.
+    """
+
+    def __init__(self):
+        self.slots: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self.names: List[Optional[str]] = []
+        self.colors = array("I")
+        self.scores = array("q")
+        self.answer_ms = array("q")
+        self.palette: List[str] = []
+        self._palette_index: Dict[str, int] = {}
+        # Encoded roster entry per slot (None = not encoded since the last change)
+        self._encoded: List[Optional[str]] = []
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __contains__(self, p_id: str) -> bool:
+        return p_id in self.slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.slots)
+
+    def slot(self, p_id: str) -> Optional[int]:
+        return self.slots.get(p_id)
+
+    def add(self, p_id: str, name: str, color: str, score: int = 0) -> int:
+        color_index = self._palette_index.get(color)
+        if color_index is None:
+            color_index = self._palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        if self._free:
+            slot = self._free.pop()
+            self.ids[slot] = p_id
+            self.names[slot] = name
+            self.colors[slot] = color_index
+            self.scores[slot] = score
+            self.answer_ms[slot] = 0
+            self._encoded[slot] = None
+        else:
+            slot = len(self.ids)
+            self.ids.append(p_id)
+            self.names.append(name)
+            self.colors.append(color_index)
+            self.scores.append(score)
+            self.answer_ms.append(0)
+            self._encoded.append(None)
+        self.slots[p_id] = slot
+        return slot
+
+    def remove(self, p_id: str) -> Optional[int]:
+        slot = self.slots.pop(p_id, None)
+        if slot is None:
+            return None
+        self.ids[slot] = None
+        self.names[slot] = None
+        self.scores[slot] = 0
+        self._encoded[slot] = None
+        self._free.append(slot)
+        return slot
+
+    def name(self, slot: int) -> str:
+        return self.names[slot]
+
+    def color(self, slot: int) -> str:
+        return self.palette[self.colors[slot]]
+
+    def score(self, slot: int) -> int:
+        return self.scores[slot]
+
+    def add_points(self, slot: int, points: int):
+        if points:
+            self.scores[slot] += points
+            self._encoded[slot] = None
+
+    def add_answer_time(self, slot: int, ms: int):
+        self.answer_ms[slot] += ms
+
+    def reset_scores(self) -> List[str]:
+        # Zero every score and answer time; returns the ids whose score changed
+        changed = []
+        for p_id, slot in self.slots.items():
+            self.answer_ms[slot] = 0
+            if self.scores[slot]:
+                self.scores[slot] = 0
+                self._encoded[slot] = None
+                changed.append(p_id)
+        return changed
+
+    def record(self, p_id: str) -> dict:
+        slot = self.slots[p_id]
+        return {"id": p_id, "name": self.names[slot], "color": self.color(slot), "score": self.scores[slot]}
+
+    def encoded(self, p_id: str) -> str:
+        # {"id", "name", "color", "score"} as JSON, encoded at most once per change
+        slot = self.slots[p_id]
+        frame = self._encoded[slot]
+        if frame is None:
+            frame = self._encoded[slot] = encode_message(self.record(p_id))
+        return frame
+
+    def roster_json(self) -> str:
+        # The whole roster as a JSON array, from the cached entries
+        return "[" + ",".join(self.encoded(p_id) for p_id in self.slots) + "]"
+
+    def records(self) -> List[dict]:
+        return [self.record(p_id) for p_id in self.slots]
+
+    def to_dict(self) -> Dict[str, dict]:
+        # Snapshot form: id -> {"name", "color", "score"}
+        return {
+            p_id: {"name": self.names[slot], "color": self.color(slot), "score": self.scores[slot]}
+            for p_id, slot in self.slots.items()
+        }
+
+    def answer_times(self) -> Dict[str, int]:
+        return {p_id: self.answer_ms[slot] for p_id, slot in self.slots.items() if self.answer_ms[slot]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, dict], answer_times: Optional[Dict[str, int]] = None) -> "ParticipantTable":
+        table = cls()
+        for p_id, p in data.items():
+            slot = table.add(p_id, p["name"], p["color"], p.get("score", 0))
+            table.answer_ms[slot] = int((answer_times or {}).get(p_id, 0))
+        return table
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import selectinload, sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import engine
+from models import Participant, Session
+from wire import decode_message, encode_message
+
+logger = logging.getLogger(__name__)
+
+# Write-behind interval (ms): game changes are batched and written at most this often
+PERSIST_FLUSH_MS = int(os.getenv("PERSIST_FLUSH_MS", "1000"))
+# Games whose last snapshot is older than this are not brought back after a restart
+RESTORE_MAX_AGE_HOURS = float(os.getenv("GAME_RESTORE_MAX_AGE_HOURS", "12"))
+
+
+class GameJournal:
+    """
+    Write-behind persistence for live games.
+
+    The game loop only calls `mark(game)` (a dict insert). A background task wakes up every
+    PERSIST_FLUSH_MS, snapshots every game marked since the last flush and writes them all in
+    one transaction: the serialized game into `session.live_state`, plus `session.status`,
+    `session.current_question_index` and the `participant` rows (names, colors, scores).
+
+    Games only need `session_code` and `to_snapshot()`; a failed write is retried on the next
+    flush.
+    """
+
+    def __init__(self, flush_ms: Optional[int] = None):
+        self.interval = max(0, PERSIST_FLUSH_MS if flush_ms is None else flush_ms) / 1000.0
+        self._sessionmaker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        # session_code -> game with unsaved changes
+        self._dirty: Dict[str, object] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.failures = 0
+
+    def stats(self) -> dict:
+        # Write-behind health: successful batches, failed ones (retried), games waiting to be saved
+        return {"batches": self.batches, "failures": self.failures, "pending": len(self._dirty)}
+
+    def mark(self, game):
+        self._dirty[game.session_code] = game
+
+    def forget(self, session_code: str):
+        # The game is gone (deleted quiz/session); don't write it back
+        self._dirty.pop(session_code, None)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # Last chance to save what changed since the previous flush
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        # Snapshot synchronously so each game is captured in a consistent state
+        snapshots = {code: game.to_snapshot() for code, game in dirty.items()}
+        try:
+            await self._write(snapshots)
+            self.batches += 1
+        except Exception:
+            self.failures += 1
+            logger.exception("Could not persist %d live game(s)", len(snapshots))
+            # Retry on the next flush (newer marks of the same game take precedence)
+            for code, game in dirty.items():
+                self._dirty.setdefault(code, game)
+
+    async def _write(self, snapshots: Dict[str, dict]):
+        async with self._sessionmaker() as db:
+            stmt = (
+                select(Session)
+                .where(Session.code.in_(list(snapshots.keys())))
+                .options(selectinload(Session.participants))
+            )
+            result = await db.exec(stmt)
+            for row in result.all():
+                snapshot = snapshots[row.code]
+                row.status = snapshot["status"]
+                row.current_question_index = snapshot["currentQuestionIndex"]
+                row.live_state = encode_message(snapshot)
+
+                existing = {p.client_id: p for p in row.participants if p.client_id}
+                for client_id, p in snapshot["participants"].items():
+                    db_participant = existing.pop(client_id, None)
+                    if db_participant is None:
+                        db.add(Participant(
+                            session_id=row.id,
+                            client_id=client_id,
+                            name=p["name"],
+                            color=p["color"],
+                            score=p["score"],
+                        ))
+                    else:
+                        db_participant.name = p["name"]
+                        db_participant.color = p["color"]
+                        db_participant.score = p["score"]
+                        db.add(db_participant)
+                # Players removed from the game (e.g. left the lobby)
+                for db_participant in existing.values():
+                    await db.delete(db_participant)
+                db.add(row)
+            await db.commit()
+
+    async def load(self, session_code: str) -> Optional[dict]:
+        # Latest snapshot of one unfinished game, if any
+        async with self._sessionmaker() as db:
+            stmt = select(Session).where(Session.code == session_code, Session.status != "FINISHED")
+            row = (await db.exec(stmt)).one_or_none()
+        if row is None or row.live_state is None:
+            return None
+        try:
+            return decode_message(row.live_state)
+        except ValueError:
+            return None
+
+    async def load_unfinished(self, now_ms: int) -> List[dict]:
+        # Snapshots of games that were still running when the process went away
+        oldest = now_ms - int(RESTORE_MAX_AGE_HOURS * 3600 * 1000)
+        async with self._sessionmaker() as db:
+            stmt = select(Session).where(Session.status != "FINISHED", Session.live_state.is_not(None))
+            result = await db.exec(stmt)
+            snapshots = []
+            for row in result.all():
+                try:
+                    snapshot = decode_message(row.live_state)
+                except ValueError:
+                    logger.warning("Skipping unreadable live state of session %s", row.code)
+                    continue
+                if snapshot.get("savedAt", 0) >= oldest:
+                    snapshots.append(snapshot)
+            return snapshots
@@ -0,0 +1,122 @@
+from typing import Optional, Tuple
+
+from media_proxy import media_path
+
+
+class _Frozen:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+class CompiledQuestion(_Frozen):
+    """
+    One question, ready for the game loop.
+
+    Option ids are strings (that's what clients send back), `option_index` maps them to their
+    position and `correct_indexes` holds the positions of the correct ones, so checking an
+    answer is a set lookup.
+    The question payloads clients see while answering and during review (and the media
+    prefetch hint) are rendered once here and shared by every state render; treat them as
+    read-only.
+    """
+
+    __slots__ = (
+        "id",
+        "text",
+        "time_limit",
+        "points",
+        "media_url",
+        "media_hint",
+        "explanation",
+        "option_ids",
+        "option_index",
+        "correct_indexes",
+        "answering_payload",
+        "review_payload",
+        "source",
+    )
+
+    def __init__(self, data: dict):
+        options = data.get("options") or []
+        option_ids = tuple(str(o["id"]) for o in options)
+        proxied = media_path(data["id"], data.get("media_url"))
+        answering = {
+            "id": str(data["id"]),
+            "text": data["text"],
+            "timeLimit": data["time_limit"],
+            # Don't send is_correct
+            "options": [{"id": oid, "text": o["text"]} for oid, o in zip(option_ids, options)],
+            "media": data.get("media_url"),
+            # Same media through the backend's cache (size variants with ?w=)
+            "mediaPath": proxied,
+        }
+        review = dict(answering)
+        review["options"] = [
+            {"id": oid, "text": o["text"], "isCorrect": o.get("is_correct")} for oid, o in zip(option_ids, options)
+        ]
+        review["explanation"] = data.get("explanation")
+
+        init = object.__setattr__
+        init(self, "id", data["id"])
+        init(self, "text", data["text"])
+        init(self, "time_limit", int(data.get("time_limit") or 0))
+        init(self, "points", int(data.get("points") or 0))
+        init(self, "media_url", data.get("media_url"))
+        # Announced while the previous question is reviewed, so clients can prefetch it
+        init(self, "media_hint", {"media": data.get("media_url"), "mediaPath": proxied} if data.get("media_url") else None)
+        init(self, "explanation", data.get("explanation"))
+        init(self, "option_ids", option_ids)
+        init(self, "option_index", {oid: i for i, oid in enumerate(option_ids)})
+        init(self, "correct_indexes", frozenset(i for i, o in enumerate(options) if o.get("is_correct")))
+        init(self, "answering_payload", answering)
+        init(self, "review_payload", review)
+        # Original question dict (snapshots store the quiz in this form)
+        init(self, "source", data)
+
+    def payload(self, reviewing: bool) -> dict:
+        return self.review_payload if reviewing else self.answering_payload
+
+
+class CompiledQuiz(_Frozen):
+    """
+    Immutable runtime form of a quiz, compiled once when its session is created (or restored).
+    """
+
+    __slots__ = ("title", "questions")
+
+    def __init__(self, title: Optional[str], questions: Tuple[CompiledQuestion, ...]):
+        object.__setattr__(self, "title", title)
+        object.__setattr__(self, "questions", questions)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def question(self, index: int) -> Optional[CompiledQuestion]:
+        if 0 <= index < len(self.questions):
+            return self.questions[index]
+        return None
+
+    def to_dict(self) -> dict:
+        # Back to the plain form `compile_quiz` takes (used for snapshots)
+        return {"title": self.title, "questions": [q.source for q in self.questions]}
+
+
+def compile_quiz(quiz_data: dict) -> CompiledQuiz:
+    # quiz_data: {"title", "questions": [{"id", "text", "time_limit", "points", "media_url",
+    # "explanation", "options": [{"id", "text", "is_correct"}]}]}
+    return CompiledQuiz(
+        quiz_data.get("title"),
+        tuple(CompiledQuestion(q) for q in quiz_data.get("questions") or []),
+    )
+
+
+def normalize_option_id(option_id) -> Optional[str]:
+    # Clients send option ids as strings, older ones sometimes as numbers
+    if option_id is None or isinstance(option_id, bool):
+        return None
+    return option_id if isinstance(option_id, str) else str(option_id)
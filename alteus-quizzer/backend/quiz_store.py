@@ -0,0 +1,161 @@
+from typing import List, Optional, Sequence
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import AnswerOption, Question, QuestionCreate, QuestionUpdate, Quiz, QuizRowChanges, QuizUpdate
+
+# Bulk writes for quiz authoring. Nothing here commits: callers run everything in one
+# transaction and commit once.
+
+# Columns an update compares (and writes only if they differ)
+QUIZ_FIELDS = ("title", "goal", "description", "default_time_limit")
+QUESTION_FIELDS = ("text", "time_limit", "points", "order", "explanation", "media_url", "question_type")
+OPTION_FIELDS = ("text", "is_correct", "order")
+
+
+def _question_row(quiz_id: int, q: QuestionCreate) -> dict:
+    return {
+        "quiz_id": quiz_id,
+        "text": q.text,
+        "time_limit": q.time_limit,
+        "points": q.points,
+        "order": q.order,
+        "explanation": q.explanation,
+        "media_url": q.media_url,
+        "question_type": q.question_type,
+    }
+
+
+async def insert_questions(db: AsyncSession, quiz_id: int, questions: List[QuestionCreate]) -> List[int]:
+    # All questions in one multi-row INSERT ... RETURNING id (ids in the order given), then all
+    # their options in one more; returns the new question ids
+    if not questions:
+        return []
+    rows = [_question_row(quiz_id, q) for q in questions]
+    orders = [q.order for q in questions]
+    if len(set(orders)) == len(orders):
+        # Distinct positions (what the editor and the AI routes send): match the returned ids
+        # by position, which every backend can batch
+        result = await db.exec(insert(Question).returning(Question.id, Question.order), params=rows)
+        id_by_order = {order: question_id for question_id, order in result.all()}
+        question_ids = [id_by_order[order] for order in orders]
+    else:
+        # Returned in parameter order; backends without a way to guarantee that (SQLite)
+        # insert row by row, still in the same transaction
+        result = await db.exec(insert(Question).returning(Question.id, sort_by_parameter_order=True), params=rows)
+        question_ids = list(result.scalars())
+    option_rows = [
+        {"question_id": question_id, "text": o.text, "is_correct": o.is_correct, "order": o.order}
+        for question_id, q in zip(question_ids, questions)
+        for o in q.options
+    ]
+    if option_rows:
+        await db.exec(insert(AnswerOption), params=option_rows)
+    return question_ids
+
+
+def _assign(row, item, fields: Sequence[str]) -> bool:
+    # Copy the differing fields of `item` onto the stored `row`; False if nothing differed
+    changed = False
+    for field in fields:
+        value = getattr(item, field, None)
+        if getattr(row, field) != value:
+            setattr(row, field, value)
+            changed = True
+    return changed
+
+
+def _match(stored: list, incoming: list) -> list:
+    # The stored row each incoming row updates (None = insert it). Clients that send ids are
+    # matched by id only, so a stored row whose id isn't sent was deleted. Clients that send
+    # none are matched by identical text, then the rest pair up in order.
+    matched = [None] * len(incoming)
+    if any(item.id is not None for item in incoming):
+        by_id = {row.id: row for row in stored}
+        for i, item in enumerate(incoming):
+            # Unknown ids (another quiz's, already deleted) are inserted as new rows
+            matched[i] = by_id.pop(item.id, None)
+        return matched
+    by_text = {}
+    for row in sorted(stored, key=lambda r: (r.order, r.id)):
+        by_text.setdefault(row.text, []).append(row)
+    claimed = set()
+    for i, item in enumerate(incoming):
+        candidates = by_text.get(item.text)
+        if candidates:
+            matched[i] = candidates.pop(0)
+            claimed.add(matched[i].id)
+    rest = iter(row for row in sorted(stored, key=lambda r: (r.order, r.id)) if row.id not in claimed)
+    for i in range(len(incoming)):
+        if matched[i] is None:
+            matched[i] = next(rest, None)
+    return matched
+
+
+async def update_quiz_rows(db: AsyncSession, db_quiz: Quiz, quiz_data: QuizUpdate) -> QuizRowChanges:
+    # Apply `quiz_data` to a stored quiz (loaded with its questions and options) as a diff:
+    # changed rows are updated, new ones inserted in bulk, removed ones deleted in bulk
+    changes = QuizRowChanges()
+    if _assign(db_quiz, quiz_data, QUIZ_FIELDS):
+        changes.updated += 1
+    else:
+        changes.unchanged += 1
+
+    matched = _match(db_quiz.questions, quiz_data.questions)
+    kept = {row.id for row in matched if row is not None}
+    removed_questions = [row for row in db_quiz.questions if row.id not in kept]
+    removed_option_ids: List[int] = []
+    new_questions: List[QuestionUpdate] = []
+    new_option_rows: List[dict] = []
+    for item, row in zip(quiz_data.questions, matched):
+        if row is None:
+            new_questions.append(item)
+            continue
+        if _assign(row, item, QUESTION_FIELDS):
+            changes.updated += 1
+        else:
+            changes.unchanged += 1
+        option_matches = _match(row.options, item.options)
+        kept_options = {option.id for option in option_matches if option is not None}
+        removed_option_ids.extend(option.id for option in row.options if option.id not in kept_options)
+        for option_item, option in zip(item.options, option_matches):
+            if option is None:
+                new_option_rows.append(
+                    {"question_id": row.id, "text": option_item.text, "is_correct": option_item.is_correct, "order": option_item.order}
+                )
+            elif _assign(option, option_item, OPTION_FIELDS):
+                changes.updated += 1
+            else:
+                changes.unchanged += 1
+
+    # Deletes and inserts are bulk statements; the updates above are flushed with them
+    if removed_option_ids:
+        await db.exec(delete(AnswerOption).where(AnswerOption.id.in_(removed_option_ids)))
+        changes.deleted += len(removed_option_ids)
+    if removed_questions:
+        removed_ids = [row.id for row in removed_questions]
+        await db.exec(delete(AnswerOption).where(AnswerOption.question_id.in_(removed_ids)))
+        await db.exec(delete(Question).where(Question.id.in_(removed_ids)))
+        changes.deleted += len(removed_ids) + sum(len(row.options) for row in removed_questions)
+    if new_option_rows:
+        await db.exec(insert(AnswerOption), params=new_option_rows)
+        changes.inserted += len(new_option_rows)
+    if new_questions:
+        await insert_questions(db, db_quiz.id, new_questions)
+        changes.inserted += len(new_questions) + sum(len(q.options) for q in new_questions)
+    return changes
+
+
+async def load_quiz(db: AsyncSession, quiz_id: int) -> Optional[Quiz]:
+    # Quiz with its questions and options, refreshed even if the session already holds it
+    stmt = (
+        select(Quiz)
+        .where(Quiz.id == quiz_id)
+        .options(selectinload(Quiz.questions).selectinload(Question.options))
+        .execution_options(populate_existing=True)
+    )
+    result = await db.exec(stmt)
+    return result.one_or_none()
@@ -0,0 +1,84 @@
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+# Inbound actions the game understands; anything else is dropped at the socket
+KNOWN_ACTIONS = {
+    "JOIN",
+    "SUBMIT_ANSWER",
+    "START_GAME",
+    "NEXT_QUESTION",
+    "SKIP_TIMER",
+    "RESET",
+    "RESYNC",
+    "CLOCK_SYNC",
+}
+
+# Per-connection limits: action -> (tokens per second, burst)
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "JOIN": (1, 5),
+    "SUBMIT_ANSWER": (5, 10),
+    "START_GAME": (2, 5),
+    "NEXT_QUESTION": (2, 5),
+    "SKIP_TIMER": (2, 5),
+    "RESET": (1, 3),
+    "RESYNC": (1, 3),
+    # The client sends a few samples in a row when it (re)connects
+    "CLOCK_SYNC": (2, 6),
+}
+
+
+def parse_limits(spec: Optional[str]) -> Dict[str, Tuple[float, float]]:
+    # "SUBMIT_ANSWER=5/10,JOIN=1/5" -> {"SUBMIT_ANSWER": (5.0, 10.0), "JOIN": (1.0, 5.0)}
+    limits = dict(DEFAULT_LIMITS)
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        action, _, value = item.partition("=")
+        rate, _, burst = value.partition("/")
+        limits[action.strip().upper()] = (float(rate), float(burst or rate))
+    return limits
+
+
+LIMITS = parse_limits(os.getenv("WS_RATE_LIMITS"))
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class ActionRateLimiter:
+    """
+    Token buckets of one connection, one per action type (created on first use).
+
+    Checked on the worker that holds the socket, before anything is forwarded to the game, so
+    a flooding client costs a dict lookup per message instead of a trip through the game loop.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.limits = LIMITS if limits is None else limits
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def allow(self, action: str) -> bool:
+        bucket = self._buckets.get(action)
+        if bucket is None:
+            limit = self.limits.get(action)
+            if limit is None:
+                return True
+            bucket = self._buckets[action] = TokenBucket(*limit)
+        return bucket.allow()
@@ -0,0 +1,210 @@
+import os
+from array import array
+from typing import Iterator, List, Optional, Tuple
+
+import numpy
+
+from quiz_runtime import CompiledQuestion
+
+# Rooms with at least this many answers are scored with NumPy; below that
+# building the arrays costs more than the loop it replaces. 0 disables the vectorized path.
+VECTOR_SCORING_MIN_ANSWERS = int(os.getenv("VECTOR_SCORING_MIN_ANSWERS", "500"))
+
+# Response-time histogram of the running question: this many equal buckets over its time limit
+ANSWER_HISTOGRAM_BUCKETS = int(os.getenv("ANSWER_HISTOGRAM_BUCKETS", "10"))
+
+NO_ANSWER = -1
+NO_AWARD = -1
+# Latency data a client didn't report
+UNKNOWN = float("nan")
+
+
+def award_points(points_system: str, base: int, time_limit: int, time_remaining: float) -> int:
+    # Points for one correct answer
+    if points_system == "no_points":
+        return 0
+    if points_system == "simple":
+        return 1
+    # Standard: base points + speed bonus (up to +50% of base)
+    bonus = 0
+    if base > 0 and time_limit > 0:
+        ratio = max(0.0, min(1.0, time_remaining / float(time_limit)))
+        bonus = int(round(base * 0.5 * ratio))
+    return base + bonus
+
+
+class AnswerColumns:
+    """
+    Answers to the running question and the points they earned, indexed by player slot (see
+    ParticipantTable).
+
+    `options` holds the index of the chosen option (NO_ANSWER if none), `remaining` the time
+    left (seconds, millisecond resolution) when the server received it and `awards` the
+    points awarded once the question is scored (NO_AWARD before that). `client_ms` (when the
+    player tapped, ms since the question started, by the client's synced clock) and `rtt_ms`
+    (the client's round trip to the server) are kept for analytics only, UNKNOWN if not sent.
+    The columns are stdlib arrays that grow to the highest slot seen, so NumPy can score them
+    in place (no per-answer conversion) while the plain loop works without it.
+
+    The answer distribution (answers per option, correct/incorrect, response-time histogram)
+    is updated on every set/discard, so reading it never scans the answers.
+    """
+
+    def __init__(self, question: Optional[CompiledQuestion] = None):
+        self.clear(question)
+
+    def __len__(self) -> int:
+        return self.answered
+
+    def _grow(self, slot: int):
+        missing = slot + 1 - len(self.options)
+        if missing > 0:
+            self.options.extend([NO_ANSWER] * missing)
+            self.remaining.extend([0.0] * missing)
+            self.client_ms.extend([UNKNOWN] * missing)
+            self.rtt_ms.extend([UNKNOWN] * missing)
+            self.awards.extend([NO_AWARD] * missing)
+
+    def option(self, slot: int) -> int:
+        return self.options[slot] if slot < len(self.options) else NO_ANSWER
+
+    def award(self, slot: int) -> Optional[int]:
+        award = self.awards[slot] if slot < len(self.awards) else NO_AWARD
+        return None if award == NO_AWARD else award
+
+    def _bucket(self, time_remaining: float) -> int:
+        elapsed = max(0.0, self.time_limit - time_remaining)
+        return min(len(self.histogram) - 1, int(elapsed / self.bucket_seconds))
+
+    def _count(self, option_index: int, time_remaining: float, delta: int):
+        self.answered += delta
+        self.option_counts[option_index] += delta
+        if option_index in self.correct_indexes:
+            self.correct += delta
+        self.histogram[self._bucket(time_remaining)] += delta
+
+    def set(
+        self,
+        slot: int,
+        option_index: int,
+        time_remaining: float,
+        client_ms: float = UNKNOWN,
+        rtt_ms: float = UNKNOWN,
+    ):
+        # New or changed answer; a change moves the player's counts to the new option/time
+        self._grow(slot)
+        previous = self.options[slot]
+        if previous != NO_ANSWER:
+            self._count(previous, self.remaining[slot], -1)
+        self.options[slot] = option_index
+        self.remaining[slot] = time_remaining
+        self.client_ms[slot] = client_ms
+        self.rtt_ms[slot] = rtt_ms
+        self._count(option_index, time_remaining, 1)
+
+    def set_award(self, slot: int, points: int):
+        self._grow(slot)
+        self.awards[slot] = points
+
+    def discard(self, slot: int):
+        # The player left: forget their answer and award (the slot may be reused)
+        if slot < len(self.options):
+            if self.options[slot] != NO_ANSWER:
+                self._count(self.options[slot], self.remaining[slot], -1)
+            self.options[slot] = NO_ANSWER
+            self.awards[slot] = NO_AWARD
+
+    def answered_slots(self) -> Iterator[int]:
+        return (slot for slot, option in enumerate(self.options) if option != NO_ANSWER)
+
+    def awarded_slots(self) -> Iterator[int]:
+        return (slot for slot, award in enumerate(self.awards) if award != NO_AWARD)
+
+    def clear(self, question: Optional[CompiledQuestion] = None):
+        # Drop every answer and award; the distribution is set up for `question`
+        self.options = array("i")
+        self.remaining = array("d")
+        self.client_ms = array("d")
+        self.rtt_ms = array("d")
+        self.awards = array("q")
+        self.answered = 0
+        self.correct = 0
+        option_count = len(question.option_ids) if question is not None else 0
+        self.option_counts = array("q", [0] * option_count)
+        self.correct_indexes = question.correct_indexes if question is not None else frozenset()
+        self.time_limit = question.time_limit if question is not None else 0
+        self.histogram = array("q", [0] * max(1, ANSWER_HISTOGRAM_BUCKETS))
+        self.bucket_seconds = max(self.time_limit, 1) / len(self.histogram)
+
+    def distribution(self, reveal: bool) -> dict:
+        # Live chart data; correct/incorrect only once the answers are revealed
+        stats = {
+            "answers": self.answered,
+            "options": self.option_counts.tolist(),
+            "responseTimes": self.histogram.tolist(),
+            "bucketSeconds": round(self.bucket_seconds, 3),
+        }
+        if reveal:
+            stats["correct"] = self.correct
+            stats["incorrect"] = self.answered - self.correct
+        return stats
+
+
+def score_columns(
+    question: CompiledQuestion,
+    columns: AnswerColumns,
+    points_system: str,
+) -> List[Tuple[int, bool, int]]:
+    # (slot, correct, points awarded) for every answered slot, in slot order
+    if 0 < VECTOR_SCORING_MIN_ANSWERS <= len(columns):
+        return _score_vectorized(question, columns, points_system)
+    return _score_loop(question, columns, points_system)
+
+
+def _score_loop(question: CompiledQuestion, columns: AnswerColumns, points_system: str) -> List[Tuple[int, bool, int]]:
+    correct = question.correct_indexes
+    base = question.points
+    time_limit = question.time_limit
+    results = []
+    for slot, (option, remaining) in enumerate(zip(columns.options, columns.remaining)):
+        if option == NO_ANSWER:
+            continue
+        if option in correct:
+            results.append((slot, True, award_points(points_system, base, time_limit, remaining)))
+        else:
+            results.append((slot, False, 0))
+    return results
+
+
+def _score_vectorized(
+    question: CompiledQuestion,
+    columns: AnswerColumns,
+    points_system: str,
+) -> List[Tuple[int, bool, int]]:
+    options = numpy.frombuffer(columns.options, dtype=numpy.int32)
+    remaining = numpy.frombuffer(columns.remaining, dtype=numpy.float64)
+    answered = options != NO_ANSWER
+
+    # Lookup table option index -> correct (extra last slot so NO_ANSWER (-1) indexes a False)
+    is_correct = numpy.zeros(len(question.option_ids) + 1, dtype=bool)
+    is_correct[list(question.correct_indexes)] = True
+    correct = is_correct[options] & answered
+
+    if points_system == "no_points":
+        awards = numpy.zeros(len(options), dtype=numpy.int64)
+    elif points_system == "simple":
+        awards = correct.astype(numpy.int64)
+    else:
+        base = question.points
+        time_limit = question.time_limit
+        if base > 0 and time_limit > 0:
+            # Same operations, in the same order, as award_points (rint rounds half to even,
+            # like round())
+            ratio = numpy.clip(remaining / float(time_limit), 0.0, 1.0)
+            bonus = numpy.rint(base * 0.5 * ratio).astype(numpy.int64)
+        else:
+            bonus = numpy.zeros(len(options), dtype=numpy.int64)
+        awards = numpy.where(correct, base + bonus, 0)
+
+    slots = numpy.flatnonzero(answered)
+    return list(zip(slots.tolist(), correct[slots].tolist(), awards[slots].tolist()))
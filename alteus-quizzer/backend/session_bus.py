@@ -0,0 +1,282 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import os
+import socket
+import uuid
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set
+
+from wire import decode_message, encode_message
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# on_command(session_code, command): apply a command on the worker that owns the session
+CommandHandler = Callable[[str, dict], Awaitable[None]]
+# on_fanout(session_code, envelope): deliver outbound frames to this worker's local sockets
+FanoutHandler = Callable[[str, dict], None]
+# on_lost(session_code): another worker may own a session this worker was running
+LostHandler = Callable[[str], Awaitable[None]]
+
+
+class SessionBus(ABC):
+    """
+    Routes live-session traffic between workers.
+
+    Every session has exactly one owning worker holding its ActiveGame. Any worker can accept a
+    WebSocket for any session: inbound actions travel to the owner via `send_command()`, and the
+    owner's outbound frames reach every worker via `publish()`, where each worker hands them to
+    its own local sockets.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._on_command: Optional[CommandHandler] = None
+        self._on_fanout: Optional[FanoutHandler] = None
+        self._on_lost: Optional[LostHandler] = None
+
+    def set_handlers(self, on_command: CommandHandler, on_fanout: FanoutHandler, on_lost: Optional[LostHandler] = None):
+        self._on_command = on_command
+        self._on_fanout = on_fanout
+        self._on_lost = on_lost
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def claim(self, session_code: str) -> bool:
+        """Become the session's owner; False if another worker already is."""
+
+    @abstractmethod
+    async def release(self, session_code: str):
+        """Give up ownership (only if this worker still holds it)."""
+
+    @abstractmethod
+    async def owner(self, session_code: str) -> Optional[str]:
+        """Worker id of the session's owner, or None."""
+
+    @abstractmethod
+    async def send_command(self, session_code: str, command: dict):
+        """Apply a command on the session's owner, wherever it runs."""
+
+    @abstractmethod
+    async def publish(self, session_code: str, envelope: dict):
+        """Deliver an owner's fanout envelope on every worker."""
+
+
+class InProcessSessionBus(SessionBus):
+    """Single-process bus: this worker owns every session and delivers everything locally."""
+
+    def __init__(self, worker_id: Optional[str] = None):
+        super().__init__(worker_id)
+        self._owned: Set[str] = set()
+
+    async def claim(self, session_code: str) -> bool:
+        self._owned.add(session_code)
+        return True
+
+    async def release(self, session_code: str):
+        self._owned.discard(session_code)
+
+    async def owner(self, session_code: str) -> Optional[str]:
+        return self.worker_id if session_code in self._owned else None
+
+    async def send_command(self, session_code: str, command: dict):
+        if session_code in self._owned:
+            await self._on_command(session_code, command)
+
+    async def publish(self, session_code: str, envelope: dict):
+        self._on_fanout(session_code, envelope)
+
+
+# Ownership changes only if the key still holds this worker's id (KEYS[1] owner key,
+# ARGV[1] worker id); a claim another worker took over after an expiry is left alone
+REFRESH_OWNER_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_OWNER_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisSessionBus(SessionBus):
+    """
+    Redis-backed bus for running several uvicorn workers/nodes.
+
+    - `{prefix}:owner:{code}`: owning worker id, claimed with SET NX and kept alive by a heartbeat
+    - `{prefix}:worker:{id}`: command channel of one worker
+    - `{prefix}:fanout:{code}`: outbound frames of a session, pattern-subscribed by every worker
+
+    Commands from other workers are queued per session and applied by a task of that session,
+    so a game whose actor queue is full only holds up its own commands, never the reader.
+
+    Takes any redis.asyncio-compatible client, so a local stand-in (e.g. fakeredis with Lua
+    support) works too; see benchmarks/check_session_bus.py.
+    """
+
+    def __init__(self, redis, worker_id: Optional[str] = None, prefix: str = "alteus", owner_ttl: int = 30):
+        super().__init__(worker_id)
+        self.redis = redis
+        self.prefix = prefix
+        self.owner_ttl = owner_ttl
+        self._owned: Set[str] = set()
+        self._pubsub = None
+        self._tasks: Set[asyncio.Task] = set()
+        # session code -> commands from other workers not yet applied (drained by one task)
+        self._inboxes: Dict[str, Deque[dict]] = {}
+
+    def _owner_key(self, session_code: str) -> str:
+        return f"{self.prefix}:owner:{session_code}"
+
+    def _worker_channel(self, worker_id: str) -> str:
+        return f"{self.prefix}:worker:{worker_id}"
+
+    def _fanout_channel(self, session_code: str) -> str:
+        return f"{self.prefix}:fanout:{session_code}"
+
+    async def start(self):
+        self._pubsub = self.redis.pubsub()
+        await self._pubsub.subscribe(self._worker_channel(self.worker_id))
+        await self._pubsub.psubscribe(self._fanout_channel("*"))
+        self._tasks.add(asyncio.create_task(self._read_loop()))
+        self._tasks.add(asyncio.create_task(self._heartbeat_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        for session_code in list(self._owned):
+            await self.release(session_code)
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def claim(self, session_code: str) -> bool:
+        claimed = await self.redis.set(self._owner_key(session_code), self.worker_id, nx=True, ex=self.owner_ttl)
+        if not claimed:
+            # Still ours from before a restart (stable WORKER_ID)
+            claimed = await self.owner(session_code) == self.worker_id
+        if claimed:
+            self._owned.add(session_code)
+        return bool(claimed)
+
+    async def release(self, session_code: str):
+        self._owned.discard(session_code)
+        await self.redis.eval(RELEASE_OWNER_SCRIPT, 1, self._owner_key(session_code), self.worker_id)
+
+    async def owner(self, session_code: str) -> Optional[str]:
+        if session_code in self._owned:
+            return self.worker_id
+        value = await self.redis.get(self._owner_key(session_code))
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    async def send_command(self, session_code: str, command: dict):
+        if session_code in self._owned:
+            # Owner is this worker: skip the broker round trip
+            await self._on_command(session_code, command)
+            return
+        owner = await self.owner(session_code)
+        if owner is None:
+            return
+        await self.redis.publish(
+            self._worker_channel(owner),
+            encode_message({"session": session_code, "command": command}),
+        )
+
+    async def publish(self, session_code: str, envelope: dict):
+        # Deliver locally right away; other workers get it through the broker
+        self._on_fanout(session_code, envelope)
+        await self.redis.publish(
+            self._fanout_channel(session_code),
+            encode_message({"origin": self.worker_id, "envelope": envelope}),
+        )
+
+    async def _read_loop(self):
+        fanout_prefix = self._fanout_channel("")
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode("utf-8")
+                payload = decode_message(message["data"])
+                if channel.startswith(fanout_prefix):
+                    if payload.get("origin") != self.worker_id:
+                        self._on_fanout(channel[len(fanout_prefix):], payload["envelope"])
+                elif payload["session"] in self._owned:
+                    self._deliver(payload["session"], payload["command"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Session bus message handling failed")
+                # Don't spin while the broker is unreachable
+                await asyncio.sleep(1)
+
+    def _deliver(self, session_code: str, command: dict):
+        # Queue a remote command for its session; starts the session's drain task if idle
+        inbox = self._inboxes.get(session_code)
+        if inbox is not None:
+            inbox.append(command)
+            return
+        inbox = self._inboxes[session_code] = deque([command])
+        task = asyncio.create_task(self._drain(session_code, inbox))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drain(self, session_code: str, inbox: Deque[dict]):
+        # Apply a session's queued commands in order; the task ends once the inbox is empty
+        try:
+            while inbox:
+                command = inbox.popleft()
+                try:
+                    await self._on_command(session_code, command)
+                except Exception:
+                    logger.exception("Command for session %s failed", session_code)
+        finally:
+            if self._inboxes.get(session_code) is inbox:
+                del self._inboxes[session_code]
+
+    async def _heartbeat_loop(self):
+        # Keep ownership keys alive; if this worker dies they expire and the session is orphaned
+        while True:
+            await asyncio.sleep(self.owner_ttl / 3)
+            for session_code in list(self._owned):
+                try:
+                    refreshed = await self.redis.eval(
+                        REFRESH_OWNER_SCRIPT, 1, self._owner_key(session_code), self.worker_id, self.owner_ttl
+                    )
+                except Exception:
+                    logger.exception("Could not refresh ownership of session %s", session_code)
+                    continue
+                if not refreshed:
+                    # The key expired (e.g. a long stall) and another worker may own it now:
+                    # stop running the session here so only one worker acts as its owner
+                    self._owned.discard(session_code)
+                    logger.warning("Lost ownership of session %s", session_code)
+                    if self._on_lost is not None:
+                        try:
+                            await self._on_lost(session_code)
+                        except Exception:
+                            logger.exception("Could not drop lost session %s", session_code)
+
+
+def create_session_bus() -> SessionBus:
+    url = os.getenv("SESSION_BUS_URL")
+    if not url:
+        return InProcessSessionBus()
+    return RedisSessionBus(aioredis.from_url(url), worker_id=os.getenv("WORKER_ID") or None)
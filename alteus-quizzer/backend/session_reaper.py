@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Finished games stay around this long after their last activity (final leaderboard)
+FINISHED_TTL_SECONDS = float(os.getenv("SESSION_FINISHED_TTL_SECONDS", "900"))
+# Unfinished games with nobody connected are dropped after this long without activity
+IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "7200"))
+# Cap on live games per worker (0 = no cap); at the cap the least recently used idle one goes
+MAX_LIVE_SESSIONS = int(os.getenv("MAX_LIVE_SESSIONS", "0"))
+SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_SECONDS", "60"))
+
+
+def deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    # Rough in-memory footprint of plain data (dicts, lists, strings, slotted/plain objects)
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        pass
+    else:
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+class SessionReaper:
+    """
+    Keeps the live games registry bounded.
+
+    A periodic sweep drops FINISHED games after FINISHED_TTL_SECONDS and games nobody is
+    connected to after IDLE_TTL_SECONDS (both measured from the game's last command).
+    `make_room()` enforces MAX_LIVE_SESSIONS when a session is created by evicting the least
+    recently used game nobody is connected to (a finished one only as a last resort). Games need `last_activity`, `status` and `has_clients()`.
+    """
+
+    def __init__(self, games: Dict[str, object], evict: Callable[[str, str], Awaitable[None]]):
+        self.games = games
+        self._evict = evict
+        self.finished_ttl = FINISHED_TTL_SECONDS
+        self.idle_ttl = IDLE_TTL_SECONDS
+        self.max_sessions = MAX_LIVE_SESSIONS
+        self._task: Optional[asyncio.Task] = None
+        self.evicted = 0
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Session sweep failed")
+
+    def expired(self, now: Optional[float] = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        codes = []
+        for code, game in self.games.items():
+            idle = now - game.last_activity
+            if game.status == "FINISHED" and idle > self.finished_ttl:
+                codes.append(code)
+            elif not game.has_clients() and idle > self.idle_ttl:
+                codes.append(code)
+        return codes
+
+    async def sweep(self):
+        for code in self.expired():
+            await self._evict(code, "Session expired")
+            self.evicted += 1
+
+    async def make_room(self) -> bool:
+        # At the cap, evict the least recently used game nobody is connected to. Only if there
+        # is none does a FINISHED game go, even with a host still on its podium screen. False
+        # if every live game is unfinished and has someone connected.
+        if self.max_sessions <= 0 or len(self.games) < self.max_sessions:
+            return True
+        candidates = [(game.last_activity, code) for code, game in self.games.items() if not game.has_clients()]
+        if not candidates:
+            candidates = [(game.last_activity, code) for code, game in self.games.items() if game.status == "FINISHED"]
+        if not candidates:
+            return False
+        _, code = min(candidates)
+        await self._evict(code, "Session evicted")
+        self.evicted += 1
+        return True
+
+    def describe(self) -> dict:
+        now = time.monotonic()
+        sessions = []
+        for code, game in self.games.items():
+            sessions.append({
+                "code": code,
+                "title": game.quiz.title,
+                "status": game.status,
+                "participants": len(game.participants),
+                "connectedParticipants": len(game.connected),
+                "screens": game.screens,
+                "idleSeconds": round(now - game.last_activity, 1),
+                "estimatedBytes": game.estimated_size(),
+            })
+        sessions.sort(key=lambda s: s["estimatedBytes"], reverse=True)
+        return {
+            "liveSessions": len(sessions),
+            "maxLiveSessions": self.max_sessions,
+            "evicted": self.evicted,
+            "totalEstimatedBytes": sum(s["estimatedBytes"] for s in sessions),
+            "sessions": sessions,
+        }
@@ -0,0 +1,113 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from wire import encode_message, with_field
+
+# Versioned state protocol
+# - STATE_UPDATE: full snapshot, sent on connect and on RESYNC requests.
+# - STATE_PATCH: changes since the previous patch. `prevSeq` lets a client detect a gap
+#   (prevSeq != its last applied seq) and ask for a RESYNC instead of applying it.
+# - ME: a participant's own score/award changed while the shared view did not.
+#
+# Patches only carry absolute values (changed top-level fields, full participant records to
+# upsert, ids to remove), so applying one on top of a slightly newer snapshot is harmless.
+#
+# Every connection group gets its own view (and its own seq stream):
+# - host: everything, including settings and per-player awards
+# - presenter: read-only TV view with the roster, without per-player awards
+# - participant: question + status only; the phone's own score/award rides along as "me"
+
+HOST_VIEW = "host"
+PRESENTER_VIEW = "presenter"
+PARTICIPANT_VIEW = "participant"
+VIEWS = (HOST_VIEW, PRESENTER_VIEW, PARTICIPANT_VIEW)
+
+
+def diff_fields(previous: Optional[dict], current: dict) -> dict:
+    if previous is None:
+        return dict(current)
+    return {k: v for k, v in current.items() if k not in previous or previous[k] != v}
+
+
+def snapshot_message(seq: int, state: dict) -> dict:
+    return {"type": "STATE_UPDATE", "seq": seq, "state": state}
+
+
+def patch_message(
+    seq: int,
+    prev_seq: int,
+    changes: dict,
+    upsert: Optional[List[dict]] = None,
+    remove: Optional[List[str]] = None,
+) -> Dict[str, object]:
+    message: Dict[str, object] = {
+        "type": "STATE_PATCH",
+        "seq": seq,
+        "prevSeq": prev_seq,
+        "changes": changes,
+    }
+    if upsert or remove:
+        message["participants"] = {"upsert": upsert or [], "remove": remove or []}
+    return message
+
+
+def encode_patch(
+    seq: int,
+    prev_seq: int,
+    changes: dict,
+    upsert: Optional[List[str]] = None,
+    remove: Optional[List[str]] = None,
+) -> str:
+    # Same frame as encode_message(patch_message(...)), with roster entries that are already
+    # encoded (see ParticipantTable.encoded) spliced in as they are. The roster key is left
+    # out when nothing in it changed.
+    frame = encode_message(patch_message(seq, prev_seq, changes))
+    if not upsert and not remove:
+        return frame
+    roster = '{"upsert":[' + ",".join(upsert or []) + '],"remove":' + encode_message(remove or []) + "}"
+    return with_field(frame, "participants", roster)
+
+
+def encode_snapshot(seq: int, encoded_state: str) -> str:
+    # Same frame as encode_message(snapshot_message(seq, state)) for an already-encoded state
+    return f'{{"type":"STATE_UPDATE","seq":{seq},"state":{encoded_state}}}'
+
+
+def me_message(me: dict) -> dict:
+    return {"type": "ME", "me": me}
+
+
+class ViewChannel:
+    """
+    Seq stream for one view of a game.
+
+    Remembers the fields of the last emitted patch so the next one only carries what changed,
+    and caches the encoded snapshot for the current seq so connect/RESYNC storms don't
+    re-render the state per socket.
+    """
+
+    def __init__(self, name: str, fields: dict):
+        self.name = name
+        self.seq = 0
+        self.fields = fields
+        self._snapshot: Optional[Tuple[int, str]] = None
+
+    def patch(
+        self,
+        fields: dict,
+        upsert: Optional[List[str]] = None,
+        remove: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        # Encoded STATE_PATCH, or None if nothing changed. `upsert`: encoded roster entries.
+        changes = diff_fields(self.fields, fields)
+        if not (changes or upsert or remove):
+            return None
+        self.fields = fields
+        prev_seq = self.seq
+        self.seq += 1
+        return encode_patch(self.seq, prev_seq, changes, upsert, remove)
+
+    def snapshot_frame(self, encode_state: Callable[[dict], str]) -> str:
+        # The snapshot reflects the fields as of `seq`; anything newer arrives in the next patch
+        if self._snapshot is None or self._snapshot[0] != self.seq:
+            self._snapshot = (self.seq, encode_snapshot(self.seq, encode_state(self.fields)))
+        return self._snapshot[1]
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import the backend modules the way main.py does (flat, from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Importing the game module builds the database engine; tests never connect to it
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
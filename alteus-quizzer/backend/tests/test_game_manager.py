@@ -0,0 +1,94 @@
+import asyncio
+
+from game_manager import MAX_PLAYER_NAME_LENGTH, ActiveGame, drop_lost_game, games, journal
+from quiz_runtime import compile_quiz
+
+
+def build_game(code: str, settings: dict = None) -> ActiveGame:
+    quiz = {
+        "title": "Test",
+        "questions": [
+            {
+                "id": i,
+                "text": f"Question {i}?",
+                "time_limit": 20,
+                "points": 1000,
+                "media_url": None,
+                "explanation": None,
+                "options": [{"id": 10 * i + j, "text": f"Option {j}", "is_correct": j == 0} for j in range(4)],
+            }
+            for i in range(1, 3)
+        ],
+    }
+    return ActiveGame(compile_quiz(quiz), code, settings=settings)
+
+
+def test_lost_session_is_dropped_without_saving():
+    async def scenario():
+        game = build_game("LOST")
+        games["LOST"] = game
+        journal.mark(game)
+        await drop_lost_game("LOST")
+        assert "LOST" not in games
+        # Saving our copy would overwrite the new owner's state
+        assert "LOST" not in journal._dirty
+        assert game.actor._task is None
+
+    asyncio.run(scenario())
+
+
+def action(client_id: str, role: str, **data) -> dict:
+    return {"type": "ACTION", "clientId": client_id, "role": role, "data": data}
+
+
+def test_dropped_rejected_and_failed_commands_are_counted_apart():
+    async def scenario():
+        game = build_game("COUNT")
+        await game.apply_commands([
+            action("p1", "participant", action="JOIN", name="Ann"),
+            # Valid, but changes nothing
+            action("p1", "participant", action="JOIN", name="Ann"),
+            # Not a participant's action
+            action("p1", "participant", action="START_GAME"),
+        ])
+        game.handle_action = lambda *args: 1 / 0
+        await game.apply_commands([action("p2", "participant", action="JOIN", name="Bob")])
+        assert (game.dropped_actions, game.rejected_actions, game.failed_commands) == (1, 1, 1)
+        game.close()
+
+    asyncio.run(scenario())
+
+
+def test_join_input_is_checked_and_capped():
+    async def scenario():
+        game = build_game("JOIN")
+        await game.apply_commands([
+            action("p1", "participant", action="JOIN", name=["x"], color={"a": 1}),
+            action("p2", "participant", action="JOIN", name="B" * 500, color="#f00"),
+        ])
+        names = {p_id: game.participants.names[game.participants.slot(p_id)] for p_id in game.participants}
+        assert names["p1"] == "Anonymous"
+        assert names["p2"] == "B" * MAX_PLAYER_NAME_LENGTH
+        assert game.failed_commands == 0
+        game.close()
+
+    asyncio.run(scenario())
+
+
+def test_auto_advance_ignores_phones_that_never_joined():
+    async def scenario():
+        game = build_game("AUTO", settings={"autoAdvance": True, "autoAdvanceGraceSeconds": 2})
+        await game.apply_commands([
+            {"type": "CONNECT", "clientId": "p1", "role": "participant"},
+            # Still on the join screen
+            {"type": "CONNECT", "clientId": "p2", "role": "participant"},
+            action("p1", "participant", action="JOIN", name="Ann"),
+            action("host", "host", action="START_GAME"),
+        ])
+        assert not game.everyone_answered()
+        await game.apply_commands([action("p1", "participant", action="SUBMIT_ANSWER", answerId=10)])
+        assert game.everyone_answered()
+        assert game.time_remaining <= 2
+        game.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+import asyncio
+import io
+
+from PIL import Image
+
+from media_proxy import MediaCache, MediaUrlCache
+
+
+def png(width: int, height: int) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_decompression_bomb_falls_back_to_original(tmp_path, monkeypatch):
+    cache = MediaCache(root=str(tmp_path))
+    path, meta = cache._write("bomb", png(2000, 2000), {"contentType": "image/png", "etag": '"bomb"'})
+    # Twice the limit is where Pillow refuses instead of warning
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    assert asyncio.run(cache._resize("bomb", path, meta, 480)) == (path, meta)
+    assert cache.errors == 1
+    assert not cache._reading
+
+
+def test_trim_keeps_original_being_rendered(tmp_path):
+    cache = MediaCache(root=str(tmp_path), max_bytes=1)
+    cache._reading["busy"] = 1
+    cache._write("busy", b"x" * 100, {"contentType": "image/png", "etag": '"a"'})
+    cache._write("other", b"y" * 100, {"contentType": "image/png", "etag": '"b"'})
+    assert (tmp_path / "busy.bin").exists()
+    assert not (tmp_path / "other.bin").exists()
+
+
+def test_url_cache_evicts_oldest_and_forgets_edited_questions():
+    urls = MediaUrlCache(size=2, ttl=60)
+    urls.put(1, "https://example.com/1.png")
+    urls.put(2, "https://example.com/2.png")
+    assert urls.get(1) == "https://example.com/1.png"
+    urls.put(3, "https://example.com/3.png")
+    # 2 was the least recently used
+    assert urls.get(2) is None
+    urls.forget([1])
+    assert urls.get(1) is None
+    assert urls.get(3) == "https://example.com/3.png"
+    assert (urls.hits, urls.misses) == (2, 2)
+
+
+def test_url_cache_entries_expire():
+    urls = MediaUrlCache(ttl=0)
+    urls.put(1, "https://example.com/1.png")
+    assert urls.get(1) is None
@@ -0,0 +1,118 @@
+"""
+Redis session bus against an in-memory stand-in (fakeredis), two workers in one process:
+command routing to the owner, fanout to the other worker, a stalled game not holding up other
+sessions' commands, and ownership refresh/release never touching another worker's claim.
+"""
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa", reason="ownership scripts need fakeredis[lua]")
+
+from fakeredis import aioredis as fake_aioredis  # noqa: E402
+
+from session_bus import RedisSessionBus, SessionBus  # noqa: E402
+
+OWNER_TTL = 3
+
+
+class Worker:
+    def __init__(self, server, worker_id: str):
+        self.bus = RedisSessionBus(fake_aioredis.FakeRedis(server=server), worker_id=worker_id, owner_ttl=OWNER_TTL)
+        self.commands = []
+        self.fanouts = []
+        self.lost = []
+        # Commands for these sessions wait until the event is set (a game with a full queue)
+        self.stalled = {}
+        self.bus.set_handlers(self.on_command, self.on_fanout, self.on_lost)
+
+    async def on_command(self, session_code: str, command: dict):
+        if session_code in self.stalled:
+            await self.stalled[session_code].wait()
+        self.commands.append((session_code, command["n"]))
+
+    def on_fanout(self, session_code: str, envelope: dict):
+        self.fanouts.append((session_code, envelope["n"]))
+
+    async def on_lost(self, session_code: str):
+        self.lost.append(session_code)
+
+
+async def wait_for(condition, timeout: float = 3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("timed out")
+        await asyncio.sleep(0.01)
+
+
+def run_workers(scenario):
+    # Two started buses on one fake server, stopped again whatever the scenario does
+    async def main():
+        server = fakeredis.FakeServer()
+        a, b = Worker(server, "worker-a"), Worker(server, "worker-b")
+        await a.bus.start()
+        await b.bus.start()
+        try:
+            await scenario(a, b)
+        finally:
+            await a.bus.stop()
+            await b.bus.stop()
+
+    asyncio.run(main())
+
+
+def test_bus_base_is_abstract():
+    with pytest.raises(TypeError):
+        SessionBus()
+
+
+def test_commands_reach_owner_and_fanout_reaches_other_worker():
+    async def scenario(a: Worker, b: Worker):
+        assert await a.bus.claim("ROUTE")
+        assert not await b.bus.claim("ROUTE")
+        assert await b.bus.owner("ROUTE") == "worker-a"
+        for n in range(3):
+            await b.bus.send_command("ROUTE", {"n": n})
+        await wait_for(lambda: [n for code, n in a.commands if code == "ROUTE"] == [0, 1, 2])
+        await a.bus.publish("ROUTE", {"n": 7})
+        await wait_for(lambda: ("ROUTE", 7) in b.fanouts)
+        # The origin delivered locally and ignores its own echo
+        await asyncio.sleep(0.1)
+        assert a.fanouts.count(("ROUTE", 7)) == 1
+
+    run_workers(scenario)
+
+
+def test_stalled_session_does_not_hold_up_others():
+    async def scenario(a: Worker, b: Worker):
+        assert await a.bus.claim("SLOW") and await a.bus.claim("FAST")
+        a.stalled["SLOW"] = asyncio.Event()
+        await b.bus.send_command("SLOW", {"n": 1})
+        await b.bus.send_command("SLOW", {"n": 2})
+        await b.bus.send_command("FAST", {"n": 3})
+        # FAST is applied while SLOW's first command is still waiting
+        await wait_for(lambda: ("FAST", 3) in a.commands)
+        assert not any(code == "SLOW" for code, _ in a.commands)
+        a.stalled.pop("SLOW").set()
+        await wait_for(lambda: [n for code, n in a.commands if code == "SLOW"] == [1, 2])
+
+    run_workers(scenario)
+
+
+def test_heartbeat_and_release_leave_another_workers_claim_alone():
+    async def scenario(a: Worker, b: Worker):
+        key = a.bus._owner_key("TAKEN")
+        assert await a.bus.claim("TAKEN")
+        # A's claim lapses (a long stall) and another worker takes the session over
+        await a.bus.redis.set(key, "worker-c", ex=60)
+        # A's heartbeat must neither reset that worker's TTL nor keep running the session
+        await wait_for(lambda: a.lost == ["TAKEN"], timeout=OWNER_TTL)
+        assert "TAKEN" not in a.bus._owned
+        assert await a.bus.redis.ttl(key) > OWNER_TTL
+        # Nor may A's release delete it
+        await a.bus.release("TAKEN")
+        assert await b.bus.owner("TAKEN") == "worker-c"
+
+    run_workers(scenario)
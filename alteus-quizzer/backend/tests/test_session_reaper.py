@@ -0,0 +1,46 @@
+import asyncio
+
+from session_reaper import SessionReaper
+
+
+class StubGame:
+    def __init__(self, status: str, last_activity: float, clients: bool):
+        self.status = status
+        self.last_activity = last_activity
+        self.clients = clients
+
+    def has_clients(self) -> bool:
+        return self.clients
+
+
+def make_room(games: dict) -> list:
+    evicted = []
+
+    async def evict(code: str, reason: str):
+        evicted.append(code)
+        games.pop(code)
+
+    reaper = SessionReaper(games, evict)
+    reaper.max_sessions = len(games)
+    assert asyncio.run(reaper.make_room()) == bool(evicted)
+    return evicted
+
+
+def test_make_room_prefers_games_without_clients():
+    games = {
+        # Oldest, but its host is still on the podium screen
+        "PODIUM": StubGame("FINISHED", 1.0, clients=True),
+        "EMPTY": StubGame("ACTIVE", 2.0, clients=False),
+        "LIVE": StubGame("ACTIVE", 0.5, clients=True),
+    }
+    assert make_room(games) == ["EMPTY"]
+
+
+def test_make_room_falls_back_to_finished_games():
+    games = {"PODIUM": StubGame("FINISHED", 1.0, clients=True), "LIVE": StubGame("ACTIVE", 0.5, clients=True)}
+    assert make_room(games) == ["PODIUM"]
+
+
+def test_make_room_refuses_when_every_game_is_in_use():
+    games = {"LIVE": StubGame("ACTIVE", 0.5, clients=True)}
+    assert make_room(games) == []
@@ -0,0 +1,104 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TimerEntry:
+    __slots__ = ("when", "callback", "cancelled", "_scheduler")
+
+    def __init__(self, when: float, callback: Callable[[], None], scheduler: "TimerScheduler"):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+        self._scheduler = scheduler
+
+    def cancel(self):
+        # O(1): the entry stays in the heap and is skipped when it reaches the top
+        if not self.cancelled:
+            self.cancelled = True
+            self._scheduler._on_cancel()
+
+
+class TimerScheduler:
+    """
+    One min-heap of deadlines (time.monotonic()) for every game in the process.
+
+    Only the earliest deadline is armed on the event loop, so a process running dozens of
+    sessions has one pending loop callback instead of one sleeping task per game. Callbacks
+    are plain functions run on the loop; anything async is for them to schedule.
+    """
+
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._armed_at: Optional[float] = None
+        self.pending = 0
+        self._cancelled_in_heap = 0
+        # Stats: how many fired, and how late (ms) the worst one was
+        self.fired = 0
+        self.max_late_ms = 0.0
+
+    def call_at(self, when: float, callback: Callable[[], None]) -> TimerEntry:
+        entry = TimerEntry(when, callback, self)
+        heapq.heappush(self._heap, (when, next(self._counter), entry))
+        self.pending += 1
+        if self._armed_at is None or when < self._armed_at:
+            self._arm()
+        return entry
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "fired": self.fired,
+            "maxLateMs": round(self.max_late_ms, 3),
+        }
+
+    def _on_cancel(self):
+        self.pending -= 1
+        self._cancelled_in_heap += 1
+        # Don't let cancelled entries pile up (e.g. many skipped questions)
+        if self._cancelled_in_heap > 64 and self._cancelled_in_heap > len(self._heap) // 2:
+            self._heap = [item for item in self._heap if not item[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled_in_heap = 0
+
+    def _arm(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            self._armed_at = None
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled_in_heap -= 1
+        if not self._heap:
+            return
+        when = self._heap[0][0]
+        loop = asyncio.get_running_loop()
+        self._handle = loop.call_later(max(0.0, when - time.monotonic()), self._fire)
+        self._armed_at = when
+
+    def _fire(self):
+        self._handle = None
+        self._armed_at = None
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, entry = heapq.heappop(self._heap)
+            if entry.cancelled:
+                self._cancelled_in_heap -= 1
+                continue
+            # Mark as done so a late cancel() is a no-op
+            entry.cancelled = True
+            self.pending -= 1
+            self.fired += 1
+            self.max_late_ms = max(self.max_late_ms, (now - entry.when) * 1000)
+            try:
+                entry.callback()
+            except Exception:
+                logger.exception("Timer callback failed")
+        self._arm()
@@ -0,0 +1,55 @@
+from typing import Any, List, Optional
+
+import msgpack
+import orjson
+
+# WebSocket subprotocols a client may offer (Sec-WebSocket-Protocol). Clients that offer none
+# get plain JSON text frames, as before.
+JSON_SUBPROTOCOL = "alteus.json"
+MSGPACK_SUBPROTOCOL = "alteus.msgpack"
+
+
+def encode_message(message: Any) -> str:
+    """
+    Encode an outbound WebSocket message into a text frame.
+
+    Broadcasts call this once and hand the same string to every socket, instead of letting
+    each `send_json` re-serialize the payload per connection.
+    """
+    return orjson.dumps(message).decode("utf-8")
+
+
+def with_field(frame: str, key: str, encoded_value: str) -> str:
+    """
+    Append an already-encoded field to an encoded JSON object frame.
+
+    Lets a shared frame be encoded once and only the small per-recipient part be added.
+    """
+    return f'{frame[:-1]},"{key}":{encoded_value}}}'
+
+
+def decode_message(data: Any) -> Any:
+    return orjson.loads(data)
+
+
+def negotiate_subprotocol(offered: List[str]) -> Optional[str]:
+    # MessagePack when the client asks for it, otherwise JSON
+    if MSGPACK_SUBPROTOCOL in offered:
+        return MSGPACK_SUBPROTOCOL
+    if JSON_SUBPROTOCOL in offered:
+        return JSON_SUBPROTOCOL
+    return None
+
+
+def to_msgpack(frame: str) -> bytes:
+    """
+    Re-encode a JSON frame as MessagePack.
+
+    Frames are built (and fanned out between workers) as JSON; binary clients get them
+    transcoded once per frame on the worker that holds their sockets.
+    """
+    return msgpack.packb(decode_message(frame))
+
+
+def decode_msgpack(data: bytes) -> Any:
+    return msgpack.unpackb(data)
@@ -5,6 +5,15 @@ const HOST = window.location.hostname;
 const ENV_API_URL = (import.meta as any)?.env?.VITE_API_URL as string | undefined;
 const API_URL = (ENV_API_URL || `http://${HOST}:8000`).replace(/\/+$/, "");
 
+// Question media: through the backend's cache when it proxies it (`width` = phone-sized
+// variant), otherwise straight from its URL
+export function mediaSrc(media: { media?: string | null; mediaPath?: string | null }, width?: number): string | null {
+    if (media.mediaPath) {
+        return `${API_URL}${media.mediaPath}${width ? `?w=${width}` : ""}`;
+    }
+    return media.media || null;
+}
+
 export async function apiRequest<T>(endpoint: string, options?: RequestInit): Promise<T> {
     const response = await fetch(`${API_URL}${endpoint}`, {
         ...options,
@@ -4,7 +4,7 @@ import { Input } from "@/components/ui/input";
 import { Textarea } from "@/components/ui/textarea";
 import { QUIZ_TEXT_LIMITS } from "@/lib/quizConstraints";
 import { Plus, Save, Loader2, Sparkles } from "lucide-react";
-import { useQuizStore, type QuizCreate, type Question } from "@/store/quizStore";
+import { useQuizStore, type QuizUpdate, type Question } from "@/store/quizStore";
 import { useNavigate, useParams } from "react-router-dom";
 import { useSettingsStore } from "@/store/settingsStore";
 import { QuestionEditorCard } from "@/components/admin/QuestionEditorCard";
@@ -218,19 +218,22 @@ export function QuizEditor() {
     };
 
     const handleSave = async () => {
-        const quizData: QuizCreate = {
+        const quizData: QuizUpdate = {
             title,
             goal,
             description,
             default_time_limit: defaultTimer,
             questions: questions.map((q, i) => ({
+                id: q.id,
                 text: q.text || "Untitled Question",
                 time_limit: q.time_limit || defaultTimer,
                 points: q.points || 1000,
                 order: i,
                 explanation: q.explanation || "",
+                media_url: q.media_url,
                 question_type: "single", // Hardcoded for now
                 options: (q.options || []).map((o, oi) => ({
+                    id: o.id,
                     text: o.text || `Option ${oi + 1}`,
                     is_correct: o.is_correct || false,
                     order: oi
@@ -15,6 +15,8 @@ export function Settings() {
         enable_test_mode: true,
         require_player_names: true,
         organization_name: "Alteus.ai",
+        auto_advance: false,
+        auto_advance_grace_seconds: 2,
         alteus_api_url: "",
         alteus_api_key: "",
         alteus_endpoint_id: "",
@@ -33,6 +35,8 @@ export function Settings() {
                 enable_test_mode: s.enable_test_mode,
                 require_player_names: s.require_player_names,
                 organization_name: s.organization_name,
+                auto_advance: s.auto_advance,
+                auto_advance_grace_seconds: s.auto_advance_grace_seconds,
                 alteus_api_url: (s.alteus_api_url || "").toString(),
                 alteus_api_key: (s.alteus_api_key || "").toString(),
                 alteus_endpoint_id: (s.alteus_endpoint_id || "").toString(),
@@ -146,6 +150,31 @@ export function Settings() {
                             </div>
                         </div>
 
+                         <div className="flex items-center justify-between p-4 border rounded-lg bg-slate-50">
+                            <div className="space-y-0.5">
+                                <label className="text-sm font-medium text-slate-900 block">Auto-advance</label>
+                                <span className="text-xs text-slate-500">End the question early once every connected player has answered.</span>
+                            </div>
+                            <div className="flex items-center gap-3">
+                                <Input
+                                    type="number"
+                                    className="w-20 h-8"
+                                    title="Grace period (seconds)"
+                                    value={form.auto_advance_grace_seconds}
+                                    disabled={isLoading || !form.auto_advance}
+                                    onChange={(e) => setForm((p) => ({ ...p, auto_advance_grace_seconds: Math.max(0, parseInt(e.target.value || "0", 10) || 0) }))}
+                                />
+                                <span className="text-xs text-slate-500">s grace</span>
+                                <input
+                                    type="checkbox"
+                                    className="h-5 w-5 rounded border-gray-300 text-primary focus:ring-primary"
+                                    checked={form.auto_advance}
+                                    disabled={isLoading}
+                                    onChange={(e) => setForm((p) => ({ ...p, auto_advance: e.target.checked }))}
+                                />
+                            </div>
+                        </div>
+
                          <div className="space-y-2 pt-2">
                             <label className="text-sm font-medium text-slate-700">Leaderboard Frequency</label>
                              <select
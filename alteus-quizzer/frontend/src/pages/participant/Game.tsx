@@ -1,4 +1,5 @@
-import { useGameStore } from "@/store/gameStore";
+import { PHONE_MEDIA_WIDTH, useGameStore } from "@/store/gameStore";
+import { mediaSrc } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import { cn } from "@/lib/utils";
 import { CheckCircle2, XCircle, AlertTriangle } from "lucide-react";
@@ -6,7 +7,7 @@ import { useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 
 export function Game() {
-  const { quiz, currentQuestionIndex, submitAnswer, lastAnswerId, status, currentPlayer, currentQuestion, timeRemaining, lastAwards } = useGameStore();
+  const { quiz, currentQuestionIndex, submitAnswer, lastAnswerId, status, currentPlayer, currentQuestion, timeRemaining, lastAwards, myRank } = useGameStore();
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -72,6 +73,11 @@ export function Game() {
                         ? (award !== null ? `+${award} Points` : "Points awarded")
                         : "Better luck next time"}
                 </div>
+                {myRank && (
+                    <div className="text-sm font-bold opacity-90">
+                        #{myRank.rank} of {myRank.totalPlayers}
+                    </div>
+                )}
             </div>
 
             <div className="flex-1 overflow-y-auto space-y-4 p-2">
@@ -123,6 +129,10 @@ export function Game() {
         </div>
       </div>
 
+      {mediaSrc(question, PHONE_MEDIA_WIDTH) && (
+        <img src={mediaSrc(question, PHONE_MEDIA_WIDTH)!} alt="" className="w-full max-h-48 object-contain rounded-xl mb-4" />
+      )}
+
       <h2 className="text-xl font-bold text-slate-800 mb-8 leading-snug">
         {question.text}
       </h2>
@@ -4,6 +4,7 @@ import { Button } from "@/components/ui/button";
 import { cn } from "@/lib/utils";
 import { ArrowRight, Check, Lightbulb } from "lucide-react";
 import { useNavigate } from "react-router-dom";
+import { mediaSrc } from "@/lib/api";
 
 export function HostGame() {
     const { 
@@ -17,7 +18,9 @@ export function HostGame() {
         connectedParticipantsCount,
         answersReceived,
         skipTimer,
-        settings
+        settings,
+        leaderboard,
+        answerStats
     } = useGameStore();
     
     const navigate = useNavigate();
@@ -33,12 +36,22 @@ export function HostGame() {
 
     if (!question) return null;
 
+    // Share of answers per option, for the live bars
+    const optionCount = (idx: number) => answerStats?.options[idx] ?? 0;
+    const optionShare = (idx: number) =>
+        answerStats && answerStats.answers > 0 ? (optionCount(idx) / answerStats.answers) * 100 : 0;
+
     if (status === 'REVIEW') {
         // Show correct answer and stats
         const leaderboardMode = settings?.leaderboardFrequency || "every_round";
         const showLeaderboard = leaderboardMode !== "end_only";
-        const sorted = [...participants].sort((a, b) => b.score - a.score);
-        const board = leaderboardMode === "top_3" ? sorted.slice(0, 3) : sorted;
+        // Ranked on the server; fall back to sorting the roster (older backends)
+        const board = leaderboard.length > 0
+            ? leaderboard
+            : [...participants]
+                .sort((a, b) => b.score - a.score)
+                .slice(0, leaderboardMode === "top_3" ? 3 : undefined)
+                .map((p, idx) => ({ ...p, rank: idx + 1 }));
         
         return (
             <div className="flex flex-col h-full gap-8 animate-in fade-in slide-in-from-bottom-8 duration-500">
@@ -64,11 +77,20 @@ export function HostGame() {
                                 </span>
                                 <span>{option.text}</span>
                             </div>
-                            {option.isCorrect && <Check size={40} />}
+                            <div className="flex items-center gap-4">
+                                {answerStats && <span className="font-mono text-xl">{optionCount(idx)}</span>}
+                                {option.isCorrect && <Check size={40} />}
+                            </div>
                         </div>
                     ))}
                 </div>
 
+                {answerStats?.correct != null && (
+                    <div className="text-center text-lg font-mono text-slate-400">
+                        {answerStats.correct} correct · {answerStats.incorrect ?? 0} incorrect
+                    </div>
+                )}
+
                 {question.explanation && (
                     <div className="max-w-6xl mx-auto w-full bg-slate-800/80 border border-slate-700 p-6 rounded-2xl flex gap-4 items-start animate-in slide-in-from-bottom-4 delay-300">
                         <div className="bg-yellow-500/10 p-3 rounded-lg text-yellow-500">
@@ -92,10 +114,10 @@ export function HostGame() {
                             </div>
                         </div>
                         <div className="grid grid-cols-1 md:grid-cols-2 gap-3">
-                            {board.map((p, idx) => (
+                            {board.map((p) => (
                                 <div key={p.id} className="flex items-center justify-between bg-slate-800/60 border border-slate-700 rounded-xl px-4 py-3">
                                     <div className="flex items-center gap-3">
-                                        <span className="font-mono text-slate-500 w-8 text-right">{idx + 1}.</span>
+                                        <span className="font-mono text-slate-500 w-8 text-right">{p.rank}.</span>
                                         <div className="w-3 h-3 rounded-full" style={{ background: p.color }} />
                                         <span className="text-slate-200 font-bold">{p.name}</span>
                                     </div>
@@ -129,6 +151,9 @@ export function HostGame() {
             </div>
 
             <div className="flex-1 flex flex-col items-center justify-center gap-16">
+                {mediaSrc(question) && (
+                    <img src={mediaSrc(question)!} alt="" className="max-h-72 max-w-3xl rounded-2xl object-contain shadow-2xl" />
+                )}
                 <h1 className="text-6xl font-black text-center text-white leading-tight max-w-5xl drop-shadow-2xl">
                     {question.text}
                 </h1>
@@ -149,11 +174,19 @@ export function HostGame() {
 
                 <div className="grid grid-cols-2 gap-8 w-full max-w-6xl">
                     {question.options.map((option, idx) => (
-                        <div key={option.id} className="bg-slate-800/80 border border-slate-700 p-8 rounded-2xl flex items-center gap-6">
-                             <span className="w-12 h-12 bg-slate-700 rounded-lg flex items-center justify-center font-bold text-white text-xl">
+                        <div key={option.id} className="relative overflow-hidden bg-slate-800/80 border border-slate-700 p-8 rounded-2xl flex items-center gap-6">
+                             {/* Live answer share */}
+                             <div
+                                className="absolute inset-y-0 left-0 bg-blue-500/10 transition-all duration-500"
+                                style={{ width: `${optionShare(idx)}%` }}
+                             />
+                             <span className="relative w-12 h-12 bg-slate-700 rounded-lg flex items-center justify-center font-bold text-white text-xl">
                                 {String.fromCharCode(65 + idx)}
                              </span>
-                             <span className="text-2xl font-medium text-slate-200">{option.text}</span>
+                             <span className="relative text-2xl font-medium text-slate-200 flex-1">{option.text}</span>
+                             {answerStats && (
+                                <span className="relative font-mono text-xl text-slate-400">{optionCount(idx)}</span>
+                             )}
                         </div>
                     ))}
                 </div>
@@ -1,4 +1,5 @@
 import { create } from 'zustand';
+import { mediaSrc } from '@/lib/api';
 
 // Types
 export type Question = {
@@ -8,6 +9,7 @@ export type Question = {
   explanation?: string;
   timeLimit: number;
   media?: string;
+  mediaPath?: string | null;
 };
 
 export type Participant = {
@@ -17,6 +19,19 @@ export type Participant = {
   score: number;
 };
 
+// Server-ranked leaderboard entry (ties broken by answer time on the server)
+export type LeaderboardEntry = Participant & { rank: number };
+
+// Live answer distribution of the current question (correct/incorrect only after it ends)
+export type AnswerStats = {
+  answers: number;
+  options: number[];
+  responseTimes: number[];
+  bucketSeconds: number;
+  correct?: number;
+  incorrect?: number;
+};
+
 export type GameStatus = 'WAITING' | 'ACTIVE' | 'REVIEW' | 'FINISHED';
 
 type GameState = {
@@ -54,9 +69,27 @@ type GameState = {
     enableTestMode: boolean;
     requirePlayerNames: boolean;
     organizationName: string;
+    autoAdvance?: boolean;
   } | null;
 
   lastAwards: Record<string, number>;
+
+  // Host/presenter: per-option counts and response times of the current question
+  answerStats: AnswerStats | null;
+
+  // Host/presenter: top of the leaderboard between questions
+  leaderboard: LeaderboardEntry[];
+  // Participant: own rank and neighbours between questions
+  myRank: { rank: number; totalPlayers: number; around: LeaderboardEntry[] } | null;
+
+  // Delta protocol: seq of the last snapshot/patch applied
+  stateSeq: number;
+
+  // Countdown: server deadline (server clock, ms) and estimated serverClock - Date.now()
+  deadline: number | null;
+  clockOffset: number;
+  // Best CLOCK_SYNC round trip (ms), sent along with answers for latency analytics
+  clockRtt: number | null;
   
   // Actions
   connect: (name: string, code: string, isHost?: boolean, existingClientId?: string) => void;
@@ -74,6 +107,13 @@ type GameState = {
 const HOST = window.location.hostname;
 const WS_URL = `ws://${HOST}:8000/ws`;
 
+// Countdown is rendered locally from the server deadline
+const COUNTDOWN_INTERVAL_MS = 250;
+const CLOCK_SYNC_SAMPLES = 3;
+// Phones load the narrower media variant
+export const PHONE_MEDIA_WIDTH = 480;
+let countdownTimer: ReturnType<typeof setInterval> | null = null;
+
 export const useGameStore = create<GameState>((set, get) => ({
   socket: null,
   isConnected: false,
@@ -92,6 +132,13 @@ export const useGameStore = create<GameState>((set, get) => ({
   participants: [],
   settings: null,
   lastAwards: {},
+  answerStats: null,
+  leaderboard: [],
+  myRank: null,
+  stateSeq: 0,
+  deadline: null,
+  clockOffset: 0,
+  clockRtt: null,
 
   connect: (name, code, isHost = false, existingClientId) => {
     // Check for existing ID or generate new
@@ -114,9 +161,97 @@ export const useGameStore = create<GameState>((set, get) => ({
 
     const ws = new WebSocket(`${WS_URL}/${code}/${clientId}`);
 
+    // Raw server state, kept so STATE_PATCH messages can be applied on top of it
+    let serverState: any = null;
+    // Participant view: own score/award ("me"), sent instead of the full roster/awards
+    let me: {
+        id: string;
+        score: number;
+        lastAward: number | null;
+        rank?: number;
+        totalPlayers?: number;
+        around?: LeaderboardEntry[];
+    } | null = null;
+    let resyncPending = false;
+    // Best clock-offset sample so far (lowest round trip wins)
+    let bestRtt = Infinity;
+
+    const updateCountdown = () => {
+        const { deadline, clockOffset, status } = get();
+        if (deadline == null || status !== 'ACTIVE') return;
+        const remainingMs = deadline - (Date.now() + clockOffset);
+        const timeRemaining = Math.max(0, Math.ceil(remainingMs / 1000));
+        if (timeRemaining !== get().timeRemaining) set({ timeRemaining });
+    };
+
+    // Media announced for the next question, loaded into the browser cache ahead of time
+    let prefetchedMedia: string | null = null;
+    const prefetchMedia = (hint: { media?: string | null; mediaPath?: string | null } | null | undefined) => {
+        if (!hint) return;
+        const src = mediaSrc(hint, isHost ? undefined : PHONE_MEDIA_WIDTH);
+        if (src && src !== prefetchedMedia) {
+            prefetchedMedia = src;
+            new Image().src = src;
+        }
+    };
+
+    const applyServerState = (state: any) => {
+        prefetchMedia(state.nextMedia);
+        // Reset lastAnswerId if we moved to a new question (and we are not just reconnecting to same q)
+        // We can check if currentQuestion ID changed
+        const currentQId = get().currentQuestion?.id;
+        const newQId = state.currentQuestion?.id;
+        
+        // Robust Reset Logic
+        // Calculate if we need to reset the answer BEFORE updating the state
+        const shouldResetAnswer = 
+            (newQId && newQId !== currentQId) || // Question changed
+            (state.status === 'WAITING' && get().status !== 'WAITING') || // Game reset
+            (state.status === 'ACTIVE' && get().status === 'REVIEW'); // New round started from review
+
+        set({
+            status: state.status,
+            currentQuestionIndex: state.currentQuestionIndex,
+            timeRemaining: state.timeRemaining,
+            deadline: state.deadline ?? null,
+            participants: state.participants || [],
+            currentQuestion: state.currentQuestion,
+            connectedParticipantsCount: state.connectedParticipantsCount ?? 0,
+            answersReceived: state.answersReceived ?? 0,
+            answerStats: state.answerStats ?? null,
+            quiz: { 
+                title: "Quiz", // Backend doesn't send full quiz title in state usually, maybe fix backend
+                questions: [], 
+                totalQuestions: state.totalQuestions 
+            },
+            settings: state.settings || null,
+            lastAwards: state.lastAwards || (me && me.lastAward != null ? { [me.id]: me.lastAward } : {}),
+            leaderboard: state.leaderboard || [],
+            myRank: me && me.rank != null
+                ? { rank: me.rank, totalPlayers: me.totalPlayers ?? 0, around: me.around || [] }
+                : null,
+            // Atomically reset answer if needed. This overwrites any previous value in the state update if merged incorrectly,
+            // but here we are replacing the whole state slice or merging? Zustand 'set' merges top level.
+            // If we provide lastAnswerId: null, it overwrites.
+            ...(shouldResetAnswer ? { lastAnswerId: null } : {})
+        });
+        updateCountdown();
+    };
+
     ws.onopen = () => {
       console.log('Connected to WebSocket');
       set({ isConnected: true, error: null, sessionCode: code, isHost });
+
+      // Clock-offset handshake, a few samples spread out a bit
+      for (let i = 0; i < CLOCK_SYNC_SAMPLES; i++) {
+          setTimeout(() => {
+              if (ws.readyState === WebSocket.OPEN) {
+                  ws.send(JSON.stringify({ action: 'CLOCK_SYNC', t0: Date.now() }));
+              }
+          }, i * 500);
+      }
+      if (countdownTimer) clearInterval(countdownTimer);
+      countdownTimer = setInterval(updateCountdown, COUNTDOWN_INTERVAL_MS);
       
       if (!isHost) {
         // Send JOIN action
@@ -155,48 +290,61 @@ export const useGameStore = create<GameState>((set, get) => ({
       const data = JSON.parse(event.data);
       console.log('Received:', data);
 
-      if (data.type === 'STATE_UPDATE') {
-        const state = data.state;
-        
-        // Reset lastAnswerId if we moved to a new question (and we are not just reconnecting to same q)
-        // We can check if currentQuestion ID changed
-        const currentQId = get().currentQuestion?.id;
-        const newQId = state.currentQuestion?.id;
-        
-        // Robust Reset Logic
-        // Calculate if we need to reset the answer BEFORE updating the state
-        const shouldResetAnswer = 
-            (newQId && newQId !== currentQId) || // Question changed
-            (state.status === 'WAITING' && get().status !== 'WAITING') || // Game reset
-            (state.status === 'ACTIVE' && get().status === 'REVIEW'); // New round started from review
+      if (data.me) me = data.me;
 
-        set({
-            status: state.status,
-            currentQuestionIndex: state.currentQuestionIndex,
-            timeRemaining: state.timeRemaining,
-            participants: state.participants,
-            currentQuestion: state.currentQuestion,
-            connectedParticipantsCount: state.connectedParticipantsCount ?? 0,
-            answersReceived: state.answersReceived ?? 0,
-            quiz: { 
-                title: "Quiz", // Backend doesn't send full quiz title in state usually, maybe fix backend
-                questions: [], 
-                totalQuestions: state.totalQuestions 
-            },
-            settings: state.settings || null,
-            lastAwards: state.lastAwards || {},
-            // Atomically reset answer if needed. This overwrites any previous value in the state update if merged incorrectly,
-            // but here we are replacing the whole state slice or merging? Zustand 'set' merges top level.
-            // If we provide lastAnswerId: null, it overwrites.
-            ...(shouldResetAnswer ? { lastAnswerId: null } : {})
-        });
+      if (data.type === 'STATE_UPDATE') {
+        serverState = data.state;
+        resyncPending = false;
+        set({ stateSeq: data.seq ?? 0 });
+        applyServerState(serverState);
+      } else if (data.type === 'STATE_PATCH') {
+        // Already covered by a newer snapshot
+        if (serverState && data.seq <= get().stateSeq) return;
+        if (!serverState || data.prevSeq !== get().stateSeq) {
+            // Missed a patch (or no snapshot yet): ask for a full snapshot instead
+            if (!resyncPending) {
+                resyncPending = true;
+                ws.send(JSON.stringify({ action: 'RESYNC' }));
+            }
+            return;
+        }
+        const removed = new Set<string>(data.participants?.remove || []);
+        const upserts: Participant[] = data.participants?.upsert || [];
+        const byId = new Map<string, Participant>(upserts.map((p) => [p.id, p]));
+        const participants = (serverState.participants || [])
+            .filter((p: Participant) => !removed.has(p.id))
+            .map((p: Participant) => {
+                const updated = byId.get(p.id);
+                if (updated) byId.delete(p.id);
+                return updated || p;
+            });
+        participants.push(...byId.values());
+        serverState = { ...serverState, ...data.changes, participants };
+        set({ stateSeq: data.seq });
+        applyServerState(serverState);
+      } else if (data.type === 'ME') {
+        if (serverState) applyServerState(serverState);
+      } else if (data.type === 'CLOCK_SYNC') {
+          const t1 = Date.now();
+          const rtt = t1 - data.t0;
+          if (rtt >= 0 && rtt < bestRtt) {
+              bestRtt = rtt;
+              set({ clockOffset: data.serverTime + rtt / 2 - t1, clockRtt: rtt });
+              updateCountdown();
+          }
       } else if (data.type === 'TICK') {
-          set({ timeRemaining: data.timeRemaining });
+          // Low-rate resync from the server
+          set({ timeRemaining: data.timeRemaining, deadline: data.deadline ?? get().deadline });
+          updateCountdown();
       }
     };
 
     ws.onclose = () => {
       console.log('Disconnected');
+      if (countdownTimer) {
+          clearInterval(countdownTimer);
+          countdownTimer = null;
+      }
       set({ isConnected: false, socket: null });
     };
     
@@ -248,9 +396,10 @@ export const useGameStore = create<GameState>((set, get) => ({
   },
 
   submitAnswer: (answerId) => {
-    const { socket, isHost } = get();
+    const { socket, isHost, clockOffset, clockRtt } = get();
     if (socket && !isHost) {
-      socket.send(JSON.stringify({ action: 'SUBMIT_ANSWER', answerId }));
+      // The server times answers itself; sentAt (server clock) and rtt are only analytics
+      socket.send(JSON.stringify({ action: 'SUBMIT_ANSWER', answerId, sentAt: Date.now() + clockOffset, rtt: clockRtt }));
       set({ lastAnswerId: answerId });
     }
   },
@@ -282,6 +431,9 @@ export const useGameStore = create<GameState>((set, get) => ({
         currentQuestion: null,
         settings: null,
         lastAwards: {},
+        answerStats: null,
+        leaderboard: [],
+        myRank: null,
         connectedParticipantsCount: 0,
         answersReceived: 0
       });
@@ -36,6 +36,9 @@ export type QuizCreate = Omit<Quiz, 'id' | 'created_at' | 'questions'> & {
     questions: Omit<Question, 'id'>[];
 };
 
+// Updates keep the ids of stored questions/options so the backend only rewrites what changed
+export type QuizUpdate = Omit<Quiz, 'id' | 'created_at'>;
+
 type QuizStore = {
     quizzes: Quiz[];
     isLoading: boolean;
@@ -43,7 +46,7 @@ type QuizStore = {
     
     fetchQuizzes: () => Promise<void>;
     createQuiz: (quiz: QuizCreate) => Promise<void>;
-    updateQuiz: (id: number, quiz: QuizCreate) => Promise<void>;
+    updateQuiz: (id: number, quiz: QuizUpdate) => Promise<void>;
     deleteQuiz: (id: number) => Promise<void>;
     getQuiz: (id: number) => Promise<Quiz | null>;
     createSession: (quizId: number) => Promise<string>; // Returns session code
@@ -9,6 +9,8 @@ export type AppSettings = {
   enable_test_mode: boolean;
   require_player_names: boolean;
   organization_name: string;
+  auto_advance: boolean;
+  auto_advance_grace_seconds: number;
   alteus_api_url?: string | null;
   alteus_api_key?: string | null;
   alteus_endpoint_id?: string | null;